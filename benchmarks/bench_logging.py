@@ -0,0 +1,76 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Micro-benchmark of the per-call logging cost in HRP.get_resource with
+DEBUG disabled, comparing the previous eager str.format calls with the
+current lazy logging.
+
+    python benchmarks/bench_logging.py
+"""
+
+from commonconf.backends import use_configparser_backend
+from os.path import abspath, dirname
+import logging
+import os
+import timeit
+
+NUMBER = 20000
+
+
+class StandInResponse(object):
+    status = 200
+
+    def __init__(self, data):
+        self.data = data
+
+
+class StandInDAO(object):
+    def __init__(self, data):
+        self.response = StandInResponse(data)
+
+    def getURL(self, url, headers):
+        return self.response
+
+    def get_service_setting(self, key, default=None):
+        return default
+
+
+def eager_get_resource(hrp, url):
+    # get_resource before lazy logging
+    from uw_hrp import logger, convert_bytes_str
+    response = hrp.DAO.getURL(url, {'Accept': 'application/json'})
+    logger.debug("{0} ==status==> {1}".format(url, response.status))
+    data = convert_bytes_str(response.data)
+    logger.debug("{0} ==data==> {1}".format(url, data))
+    return data
+
+
+def main():
+    use_configparser_backend(abspath(os.path.join(
+        dirname(__file__), "..", "conf", "test.conf")), 'HRP')
+    from uw_hrp import HRP
+
+    logging.getLogger("uw_hrp").setLevel(logging.INFO)
+    path = abspath(os.path.join(
+        dirname(__file__), "..", "uw_hrp", "resources", "hrpws", "file",
+        "hrp", "v3", "person", "faculty.json"))
+    with open(path, "rb") as f:
+        data = f.read()
+
+    hrp = HRP()
+    hrp.DAO = StandInDAO(data)
+    url = "/hrp/v3/person/faculty.json"
+    eager = timeit.timeit(
+        lambda: eager_get_resource(hrp, url), number=NUMBER)
+    lazy = timeit.timeit(lambda: hrp.get_resource(url), number=NUMBER)
+
+    print("payload: {0} bytes, {1} calls".format(len(data), NUMBER))
+    print("eager: {0:.2f} us/call".format(eager / NUMBER * 1e6))
+    print("lazy:  {0:.2f} us/call".format(lazy / NUMBER * 1e6))
+    print("saved: {0:.2f} us/call".format((eager - lazy) / NUMBER * 1e6))
+
+
+if __name__ == '__main__':
+    main()
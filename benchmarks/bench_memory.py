@@ -0,0 +1,45 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compares the memory held by uw_hrp.models.Person objects and by
+uw_hrp.compact.CompactPerson tuples built from the fixture persons.
+
+    python benchmarks/bench_memory.py [count]
+"""
+
+import sys
+import time
+import tracemalloc
+from corpus import load_fixture_persons
+from uw_hrp.compact import CompactPerson
+from uw_hrp.models import Person
+
+
+def measure(name, build, records):
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [build(data) for data in records]
+    seconds = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{0:<14} {1:10.1f} KB held {2:8.2f} KB/record {3:8.1f} us/record"
+          .format(name, size / 1024, size / 1024 / len(objects),
+                  seconds / len(objects) * 1e6))
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    persons = load_fixture_persons()
+    records = [persons[i % len(persons)] for i in range(count)]
+    print("{0} records".format(count))
+    model_size = measure("Person", lambda d: Person(data=d), records)
+    compact_size = measure("CompactPerson", CompactPerson.from_data, records)
+    print("CompactPerson uses {0:.0%} of the Person memory".format(
+        compact_size / model_size))
+
+
+if __name__ == '__main__':
+    main()
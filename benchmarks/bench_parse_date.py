@@ -0,0 +1,79 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Benchmark of uw_hrp.models.parse_date against dateutil's parser over
+the date fields of the fixture persons, and of Person construction
+with each.
+
+    python benchmarks/bench_parse_date.py
+"""
+
+from corpus import load_fixture_persons
+from dateutil.parser import parse
+import timeit
+import uw_hrp.models
+from uw_hrp.models import Person, parse_date, _parse_date_str
+
+NUMBER = 200
+DATE_FIELDS = ["HireDate", "StartDate", "PositionVacateDate",
+               "RetirementDate", "TerminationDate"]
+
+
+def find_dates(data):
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key in DATE_FIELDS and value is not None:
+                yield value
+            else:
+                yield from find_dates(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from find_dates(value)
+
+
+def dateutil_parse_date(date_str):
+    if date_str is not None:
+        return parse(date_str)
+    return None
+
+
+def report(name, seconds, count):
+    print("{0:<32} {1:8.2f} us/op".format(name, seconds / count * 1e6))
+
+
+def main():
+    persons = load_fixture_persons()
+    dates = [d for person in persons for d in find_dates(person)]
+    print("{0} persons, {1} dates ({2} distinct)".format(
+        len(persons), len(dates), len(set(dates))))
+
+    count = NUMBER * len(dates)
+    report("dateutil parse", timeit.timeit(
+        lambda: [dateutil_parse_date(d) for d in dates],
+        number=NUMBER), count)
+
+    def uncached():
+        _parse_date_str.cache_clear()
+        for d in dates:
+            parse_date(d)
+            _parse_date_str.cache_clear()
+    report("parse_date (uncached)", timeit.timeit(
+        uncached, number=NUMBER), count)
+
+    _parse_date_str.cache_clear()
+    report("parse_date (cached)", timeit.timeit(
+        lambda: [parse_date(d) for d in dates], number=NUMBER), count)
+
+    count = NUMBER * len(persons)
+    uw_hrp.models.parse_date = dateutil_parse_date
+    report("Person() with dateutil", timeit.timeit(
+        lambda: [Person(data=p) for p in persons], number=NUMBER), count)
+    uw_hrp.models.parse_date = parse_date
+    report("Person() with parse_date", timeit.timeit(
+        lambda: [Person(data=p) for p in persons], number=NUMBER), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Throughput and memory benchmarks over a synthetic corpus of hrpws v3
+person documents (see corpus.py). Each case runs in a fresh process and
+reports records per second and the process's peak RSS. Generating the
+documents is not included in the timings.
+
+    python benchmarks/bench_suite.py [--count 155000] [--cases ...]
+        [--output results.json] [--compare baseline.json]
+
+Results are saved as json (by default bench-<uw_hrp version>.json), and
+--compare prints the change against an earlier results file, exiting
+with status 1 if a case regressed by more than --threshold.
+"""
+
+from commonconf.backends import use_configparser_backend
+from concurrent.futures import ProcessPoolExecutor
+from os.path import abspath, dirname
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+CASES = ("json_decode", "person_build", "person_to_json", "person_search")
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def bench_json_decode(corpus, page_size):
+    seconds = 0.0
+    for text in corpus:
+        start = time.perf_counter()
+        json.loads(text)
+        seconds += time.perf_counter() - start
+    return seconds
+
+
+def bench_person_build(corpus, page_size):
+    from uw_hrp.models import Person
+    seconds = 0.0
+    for text in corpus:
+        data = json.loads(text)
+        start = time.perf_counter()
+        Person(data=data)
+        seconds += time.perf_counter() - start
+    return seconds
+
+
+def bench_person_to_json(corpus, page_size):
+    from uw_hrp.models import Person
+    seconds = 0.0
+    for text in corpus:
+        person = Person(data=json.loads(text))
+        start = time.perf_counter()
+        person.to_json()
+        seconds += time.perf_counter() - start
+    return seconds
+
+
+class StandInResponse(object):
+    status = 200
+    headers = {}
+
+    def __init__(self, data):
+        self.data = data
+
+
+class StandInDAO(object):
+    """
+    Serves the corpus as search result pages, timing the page rendering
+    so that it can be excluded
+    """
+    def __init__(self, corpus, page_size):
+        self.corpus = corpus
+        self.page_size = page_size
+        self.seconds = 0.0
+
+    def getURL(self, url, headers):
+        from uw_hrp import get_page_start
+        start = time.perf_counter()
+        data = self.corpus.render_page(
+            get_page_start(url), self.page_size).encode("utf-8")
+        self.seconds += time.perf_counter() - start
+        return StandInResponse(data)
+
+    def get_service_setting(self, key, default=None):
+        return default
+
+
+def bench_person_search(corpus, page_size):
+    from uw_hrp import HRP
+    hrp = HRP()
+    hrp.DAO = StandInDAO(corpus, page_size)
+    start = time.perf_counter()
+    count = 0
+    for person in hrp.iter_person_search(
+            current_faculty="true", page_size=page_size):
+        count += 1
+    seconds = time.perf_counter() - start
+    assert count == len(corpus), count
+    return seconds - hrp.DAO.seconds
+
+
+def run_case(case, count, page_size):
+    """
+    Runs the case in this process, returning its results
+    """
+    use_configparser_backend(abspath(os.path.join(
+        dirname(__file__), "..", "conf", "test.conf")), 'HRP')
+    from corpus import Corpus
+    corpus = Corpus(count)
+    start_rss = peak_rss_mb()
+    seconds = globals()["bench_" + case](corpus, page_size)
+    rss = peak_rss_mb()
+    return {
+        "records": count,
+        "seconds": round(seconds, 4),
+        "records_per_sec": round(count / seconds, 1),
+        "peak_rss_mb": round(rss, 1),
+        "rss_growth_mb": round(rss - start_rss, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints each case's change from the baseline, returning the names of
+    the cases that regressed by more than threshold
+    """
+    regressions = []
+    print("\n{0:<16} {1:>12} {2:>12} {3:>8} {4:>10} {5:>10}".format(
+        "vs " + baseline.get("version", "baseline"), "rec/s", "was",
+        "change", "peak MB", "was"))
+    for case, result in results["results"].items():
+        old = baseline.get("results", {}).get(case)
+        if old is None:
+            continue
+        speed = result["records_per_sec"] / old["records_per_sec"] - 1
+        memory = result["peak_rss_mb"] / old["peak_rss_mb"] - 1
+        regressed = speed < -threshold or memory > threshold
+        if regressed:
+            regressions.append(case)
+        print("{0:<16} {1:12.1f} {2:12.1f} {3:+8.1%} {4:10.1f} {5:10.1f}"
+              "{6}".format(case, result["records_per_sec"],
+                           old["records_per_sec"], speed,
+                           result["peak_rss_mb"], old["peak_rss_mb"],
+                           "  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    sys.path.insert(0, dirname(abspath(__file__)))
+    with open(abspath(os.path.join(
+            dirname(__file__), "..", "uw_hrp", "VERSION"))) as f:
+        version = f.read().strip()
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=10000,
+                        help="synthetic records per case")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="comma separated, of " + ", ".join(CASES))
+    parser.add_argument("--output",
+                        default="bench-{0}.json".format(version))
+    parser.add_argument("--compare", help="an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="the regression ratio to fail on")
+    args = parser.parse_args()
+
+    cases = [case for case in args.cases.split(",") if case]
+    for case in cases:
+        if case not in CASES:
+            parser.error("unknown case: {0}".format(case))
+
+    results = {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "count": args.count,
+        "page_size": args.page_size,
+        "results": {},
+    }
+    print("{0} records, uw_hrp {1}, python {2}".format(
+        args.count, version, results["python"]))
+    print("{0:<16} {1:>12} {2:>10} {3:>10}".format(
+        "case", "rec/s", "peak MB", "growth MB"))
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        # a fresh process per case, so each peak RSS is its own
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(
+                run_case, case, args.count, args.page_size).result()
+        results["results"][case] = result
+        print("{0:<16} {1:12.1f} {2:10.1f} {3:10.1f}".format(
+            case, result["records_per_sec"], result["peak_rss_mb"],
+            result["rss_growth_mb"]))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("saved {0}".format(args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
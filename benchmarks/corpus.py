@@ -0,0 +1,168 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Generates synthetic hrpws v3 person documents and search pages from the
+fixture persons, for benchmarks at production scale. Documents are
+rendered on demand from string templates, so a corpus of any size is
+streamed rather than held in memory.
+
+    python benchmarks/corpus.py [count] > persons.jsonl
+"""
+
+from datetime import datetime, timedelta, timezone
+from os.path import abspath, dirname
+import glob
+import json
+import os
+import sys
+
+RESOURCE_DIR = abspath(os.path.join(
+    dirname(__file__), "..", "uw_hrp", "resources", "hrpws", "file",
+    "hrp", "v3"))
+SEARCH_URL = "/hrp/v3/person.json"
+FIRST_EMPLOYEE_ID = 200000000
+# the i-th synthetic worker's manager is worker (i - 1) // SPAN
+SPAN = 8
+ORG_COUNT = 400
+START_TIME = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def load_fixture_persons():
+    """
+    Returns the v3 person documents, in file name order
+    """
+    persons = []
+    for path in sorted(glob.glob(os.path.join(RESOURCE_DIR, "person", "*"))):
+        with open(path) as f:
+            persons.append(json.load(f))
+    return persons
+
+
+def load_templates():
+    """
+    Returns the distinct fixture person dicts, from the v3 person
+    documents and search pages
+    """
+    persons = {}
+    for path in sorted(glob.glob(os.path.join(RESOURCE_DIR, "person", "*")) +
+                       glob.glob(os.path.join(RESOURCE_DIR, "person.json*"))):
+        with open(path) as f:
+            data = json.load(f)
+        for person in data.get("Persons") or [data]:
+            persons.setdefault(person["EmployeeID"], person)
+    return list(persons.values())
+
+
+def escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class PersonTemplate(object):
+    """
+    A fixture person serialized as a str.format template, with fields
+    for its identifiers, org codes, manager and timestamp
+    """
+    def __init__(self, data):
+        text = escape(json.dumps(data))
+        ids = dict((id["Type"], id["Value"]) for id in data["IDs"])
+        replacements = [
+            (data["RegID"], "{regid}"),
+            (data["EmployeeID"], "{eid}"),
+            ('"{0}"'.format(ids.get("NetID")), '"{netid}"'),
+            ('"{0}"'.format(ids.get("StudentID")), '"{student_id}"'),
+            ('"{0}"'.format(data["RepositoryTimeStamp"]), '"{timestamp}"'),
+        ]
+        self.org_fields = []
+        for wk_detail in data["WorkerDetails"]:
+            for emp_detail in wk_detail["EmploymentDetails"]:
+                org_name = emp_detail["SupervisoryOrganization"]["Name"]
+                if ": " in org_name:
+                    field = "org{0}".format(len(self.org_fields))
+                    name = escape(json.dumps(org_name.split(": ", 1)[1]))
+                    replacements.append((
+                        escape(json.dumps(org_name)),
+                        '"{{{0}}}: {1}'.format(field, name[1:])))
+                    self.org_fields.append(field)
+                for manager in emp_detail.get("Managers") or []:
+                    for id in manager.get("IDs") or []:
+                        if id["Type"] == "Employee_ID":
+                            replacements.append(
+                                ('"{0}"'.format(id["Value"]), '"{sup}"'))
+        for value, field in replacements:
+            text = text.replace(value, field)
+        self.format = text.format
+
+    def render(self, i):
+        values = {
+            "eid": "{0:09d}".format(FIRST_EMPLOYEE_ID + i),
+            "regid": "{0:032X}".format(0xB0000000 + i),
+            "netid": "u{0:07d}".format(i),
+            "student_id": "{0:07d}".format(2000000 + i),
+            "sup": "{0:09d}".format(FIRST_EMPLOYEE_ID + (i - 1) // SPAN),
+            "timestamp": (START_TIME + timedelta(seconds=i)).isoformat(
+                timespec="milliseconds"),
+        }
+        for n, field in enumerate(self.org_fields):
+            values[field] = "O{0:03d}".format((i // SPAN + n) % ORG_COUNT)
+        return self.format(**values)
+
+
+class Corpus(object):
+    """
+    count synthetic person documents, the i-th rendered from the
+    fixture templates in turn
+    """
+    def __init__(self, count):
+        self.count = count
+        self.templates = [PersonTemplate(data) for data in load_templates()]
+
+    def __len__(self):
+        return self.count
+
+    def render(self, i):
+        return self.templates[i % len(self.templates)].render(i)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.render(i)
+
+    def render_page(self, page_start, page_size,
+                    params="current_faculty=true"):
+        """
+        Returns the search result page (1-based page_start) as json text
+        with the Next.Href, TotalCount and paging of the hrpws v3 pages
+        """
+        def page_href(start):
+            return {
+                "Href": "{0}?{1}&page_size={2}&page_start={3}".format(
+                    SEARCH_URL, params, page_size, start),
+                "PageStart": str(start),
+                "PageSize": str(page_size),
+            }
+
+        first = (page_start - 1) * page_size
+        last = min(first + page_size, self.count)
+        envelope = json.dumps({
+            "PageStart": str(page_start),
+            "TotalCount": self.count,
+            "Current": page_href(page_start),
+            "Next": page_href(page_start + 1) if last < self.count else None,
+            "Previous": (page_href(page_start - 1) if page_start > 1
+                         else None),
+            "Persons": None,
+        })
+        return envelope.replace('"Persons": null', '"Persons": [{0}]'.format(
+            ",".join(self.render(i) for i in range(first, last))))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for text in Corpus(count):
+        sys.stdout.write(text)
+        sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,23 @@ This is the interface for interacting with the hrp web service.
 
 import logging
 import json
+import math
 import re
-from urllib.parse import urlencode
+import threading
+from datetime import timezone
+from email.utils import format_datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+from uw_hrp.cache import CachedPerson, SingleFlight
+from uw_hrp.checkpoint import JSONFileCheckpointStore
 from uw_hrp.dao import HRP_DAO
+from uw_hrp.instrument import NULL_CALL, Call
 from restclients_core.exceptions import (
     DataFailureException, InvalidRegID, InvalidNetID, InvalidEmployeeID)
-from uw_hrp.models import Person
+from uw_hrp.models import Person, parse_date, validate_fields
+from uw_hrp.resilience import CircuitBreaker, RetryPolicy
 
 logger = logging.getLogger(__name__)
 re_netid = re.compile(r'^[a-z][a-z0-9\-\_\.]{,127}$', re.I)
@@ -24,45 +35,289 @@ re_employee_id = re.compile(r'^\d{9}$')
 class HRP(object):
     URL_PREFIX = "/hrp/v3/person"
     SUFFIX = "future_worker=true"
+    PAGE_SIZE = 200
+    _refreshing = set()
+    _refresh_lock = threading.Lock()
+    _refresh_executor = None
 
-    def __init__(self):
+    def __init__(self, cache=None, lazy=False, retry=None, breaker=None,
+                 instrument=None):
+        """
+        cache: an optional uw_hrp.cache.LRUCache or BackendCache (any
+        object with get and set) holding uw_hrp.cache.CachedPerson
+        entries by request url
+        lazy: build each Person's worker_details on first access
+        retry: an optional uw_hrp.resilience.RetryPolicy for transient
+        failures, defaulting to one built from the RETRIES settings
+        breaker: an optional uw_hrp.resilience.CircuitBreaker, defaulting
+        to the one shared per the BREAKER_FAILURES settings
+        instrument: an optional callable receiving a uw_hrp.instrument.Call
+        with the stage timings of each request, such as a StageStats
+        """
         self.DAO = HRP_DAO()
         self.req_url = None
+        self.cache = cache
+        self.lazy = lazy
+        self.retry = retry if retry is not None else RetryPolicy.from_dao(
+            self.DAO)
+        self.breaker = (breaker if breaker is not None else
+                        CircuitBreaker.from_dao(self.DAO))
+        self.instrument = instrument
+        self._inflight = SingleFlight.from_dao(self.DAO)
 
     def get_resource(self, url):
+        call = self._start_call(url)
+        try:
+            return self._get_data(call, url)
+        finally:
+            call.finish()
+
+    def get_response(self, url, headers=None):
+        """
+        Returns the 200 response for url or, when the conditional request
+        headers match, a 304 response. Raises DataFailureException.
+        """
         self.req_url = url
-        response = self.DAO.getURL(url, {'Accept': 'application/json'})
-        logger.debug("{0} ==status==> {1}".format(url, response.status))
-        if response.status != 200:
-            raise DataFailureException(
-                url, response.status, response.data)
+        if self.breaker is not None:
+            return self.breaker.call(url, self._retry_get_url, url, headers)
+        return self._retry_get_url(url, headers)
+
+    def _start_call(self, url):
+        if self.instrument is None:
+            return NULL_CALL
+        return Call(url, self.instrument)
+
+    def _call_response(self, call, url, headers=None):
+        with call.stage("fetch"):
+            try:
+                response = self.get_response(url, headers)
+            except DataFailureException as ex:
+                call.set_status(ex.status)
+                raise
+        call.set_response(response)
+        return response
+
+    def _get_data(self, call, url):
+        response = self._call_response(call, url)
+        with call.stage("decode"):
+            return self._response_data(url, response)
+
+    def _response_data(self, url, response):
         data = convert_bytes_str(response.data)
-        logger.debug("{0} ==data==> {1}".format(url, data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s ==data==> %s", url, format_log_data(
+                data, self.DAO.get_service_setting("LOG_DATA_LIMIT")))
         return data
 
-    def get_person_by_employee_id(self, employee_id, include_future=False):
+    def _retry_get_url(self, url, headers=None):
+        if self.retry is not None:
+            return self.retry.call(self._get_url, url, headers)
+        return self._get_url(url, headers)
+
+    def _get_url(self, url, headers=None):
+        request_headers = {'Accept': 'application/json'}
+        if headers:
+            request_headers.update(headers)
+        response = self.DAO.getURL(url, request_headers)
+        logger.debug("%s ==status==> %s", url, response.status)
+        if response.status != 200 and not (
+                headers and response.status == 304):
+            raise DataFailureException(
+                url, response.status, response.data)
+        return response
+
+    def get_person_by_employee_id(self, employee_id, include_future=False,
+                                  use_cache=True, fields=None):
         if not valid_employee_id(employee_id):
             raise InvalidEmployeeID(employee_id)
-        return self._get_person(employee_id, include_future)
+        return self._get_person(
+            employee_id, include_future, use_cache, fields)
 
-    def get_person_by_netid(self, netid, include_future=False):
+    def get_person_by_netid(self, netid, include_future=False,
+                            use_cache=True, fields=None):
         if not valid_uwnetid(netid):
             raise InvalidNetID(netid)
-        return self._get_person(netid, include_future)
+        return self._get_person(netid, include_future, use_cache, fields)
 
-    def get_person_by_regid(self, regid, include_future=False):
+    def get_person_by_regid(self, regid, include_future=False,
+                            use_cache=True, fields=None):
         if not valid_uwregid(regid):
             raise InvalidRegID(regid)
-        return self._get_person(regid, include_future)
+        return self._get_person(regid, include_future, use_cache, fields)
 
-    def _get_person(self, id, include_future):
+    def get_persons(self, ids, id_type="netid", include_future=False,
+                    max_workers=8, fields=None):
+        """
+        Returns a dict of id to Person for the given netids, regids or
+        employee_ids (id_type), fetched in parallel. Each invalid id or
+        failed lookup maps to its exception instead of aborting the batch.
         """
-        Return a restclients.models.hrp.WorkerDetails object
+        validators = {
+            "netid": (valid_uwnetid, InvalidNetID),
+            "regid": (valid_uwregid, InvalidRegID),
+            "employee_id": (valid_employee_id, InvalidEmployeeID),
+        }
+        if id_type not in validators:
+            raise ValueError("Invalid id_type: {0}".format(id_type))
+        is_valid, invalid_exception = validators[id_type]
+
+        persons = dict.fromkeys(ids)
+        valid_ids = []
+        for id in persons:
+            if is_valid(id):
+                valid_ids.append(id)
+            else:
+                persons[id] = invalid_exception(id)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(id, executor.submit(
+                self._get_person, id, include_future, True, fields))
+                for id in valid_ids]
+            for id, future in futures:
+                try:
+                    persons[id] = future.result()
+                except Exception as ex:
+                    persons[id] = ex
+        return persons
+
+    def _get_person(self, id, include_future, use_cache=True, fields=None):
         """
+        Return a uw_hrp.models.Person object. Cached Person objects are
+        shared and should not be modified. With use_cache False, the
+        cache is bypassed on read but refreshed with the response.
+        fields: only build these parts of the worker details (see
+        uw_hrp.models.WORKER_FIELDS); a projected Person is not cached.
+        """
+        validate_fields(fields)
+        url = self._person_url(id, include_future)
+        cached, state = self._lookup_cached(url, use_cache)
+        if state == "fresh":
+            return cached.person
+        if state == "stale":
+            self._refresh_person(url, include_future, cached)
+            return cached.person
+        return self._fetch_person(url, include_future, fields, cached).person
+
+    def _lookup_cached(self, url, use_cache=True):
+        """
+        Returns (entry, state), the cached CachedPerson for url and
+        whether it is "fresh", "stale" (still served, while it is
+        refreshed) or "expired" (kept for its validators), or
+        (None, None). With use_cache False, an entry is only looked up
+        for its validators, without counting a hit or miss.
+        """
+        if self.cache is None:
+            return None, None
+        if use_cache:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached, "fresh"
+            get_stale = getattr(self.cache, "get_stale", None)
+            cached = get_stale(url) if get_stale is not None else None
+            if cached is not None:
+                return cached, "stale"
+        get_expired = getattr(self.cache, "get_expired", None)
+        cached = get_expired(url) if get_expired is not None else None
+        if cached is not None:
+            return cached, "expired"
+        return None, None
+
+    def _fetch_person(self, url, include_future, fields=None, cached=None):
+        """
+        Returns the CachedPerson for url, fetched with the validators of
+        the cached entry, if any, and caches it unless it is projected.
+        Concurrent fetches of the same url by clients using the same DAO
+        share one upstream request and its Person or DataFailureException.
+        """
+        if fields is not None:
+            return self._inflight.do(
+                (url, self.lazy, tuple(fields)), self._load_person, url,
+                fields)
+
+        entry = self._inflight.do(
+            (url, self.lazy, None), self._load_person, url, None, cached)
+        if self.cache is not None:
+            self._set_cached_person(url, entry, include_future)
+        return entry
+
+    def _load_person(self, url, fields, cached=None):
+        """
+        Returns a CachedPerson for url, which is cached if the request
+        with its validators is answered 304 Not Modified
+        """
+        call = self._start_call(url)
+        try:
+            response = self._call_response(
+                call, url, cached.conditional_headers() if cached else None)
+            if response.status == 304:
+                return cached
+
+            with call.stage("decode"):
+                data = self._response_data(url, response)
+            with call.stage("parse"):
+                data = json.loads(data)
+            with call.stage("build"):
+                person = self._person(data, fields)
+            call.set_records(1)
+        finally:
+            call.finish()
+        return CachedPerson(
+            person,
+            get_response_header(response, "ETag"),
+            get_response_header(response, "Last-Modified") or to_http_date(
+                data.get("RepositoryTimeStamp")))
+
+    def _refresh_person(self, url, include_future, cached=None):
+        """
+        Refetches and caches the person at url in a background thread,
+        unless a refresh of url into this cache is already running.
+        Returns the Future, or None.
+        """
+        key = (id(self.cache), url)
+        with HRP._refresh_lock:
+            if key in HRP._refreshing:
+                return None
+            HRP._refreshing.add(key)
+            if HRP._refresh_executor is None:
+                HRP._refresh_executor = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix="uw_hrp_refresh")
+        return HRP._refresh_executor.submit(
+            self._revalidate_person, url, include_future, cached)
+
+    def _revalidate_person(self, url, include_future, cached=None):
+        try:
+            return self._fetch_person(
+                url, include_future, cached=cached).person
+        except Exception as ex:
+            logger.warning("Refresh of %s failed: %s", url, ex)
+        finally:
+            with HRP._refresh_lock:
+                HRP._refreshing.discard((id(self.cache), url))
+
+    def _set_cached_person(self, url, entry, include_future):
+        """
+        Caches the CachedPerson entry under url and, if the cache has
+        set_alias, aliases the urls for each of the person's other
+        identifiers to it, so that a lookup by any of them is served
+        from the same entry.
+        """
+        self.cache.set(url, entry)
+        set_alias = getattr(self.cache, "set_alias", None)
+        if set_alias is None:
+            return
+        for id in entry.person.identifiers():
+            alias = self._person_url(id, include_future)
+            if alias != url:
+                set_alias(alias, url)
+
+    def _person(self, data, fields=None):
+        return Person(data=data, lazy=self.lazy, fields=fields)
+
+    def _person_url(self, id, include_future):
         url = "{0}/{1}.json".format(self.URL_PREFIX, id)
         if include_future:
             url = "{0}?{1}".format(url, self.SUFFIX)
-        return Person(data=json.loads(self.get_resource(url)))
+        return url
 
     def person_search(self, **kwargs):
         """
@@ -74,23 +329,154 @@ class HRP(object):
             current_faculty: true|false
             future_worker: string
             location: string
+            page_size: int, defaults to 200
             supervisory_organization: string
             worker_wid: string
+        and fields, the parts of the worker details to build (see
+        uw_hrp.models.WORKER_FIELDS)
         """
-        url = "{0}.json?{1}&page_size=200".format(
-            self.URL_PREFIX, urlencode(kwargs))
-        persons = []
-        while True:
-            data = json.loads(self.get_resource(url))
-            if "Persons" in data:
-                for person_record in data.get("Persons"):
-                    persons.append(Person(data=person_record))
-            if (data.get("Next") and data["Next"].get("Href") and
-                    len(data["Next"]["Href"]) > 0):
-                url = data["Next"]["Href"]
-            else:
-                break
-        return persons
+        return list(self.iter_person_search(**kwargs))
+
+    def iter_person_search(self, checkpoint=None, fields=None, **kwargs):
+        """
+        Yields Person objects page by page as the Next.Href links are
+        followed, so only the current search page is held in memory.
+        Takes the same parameters as person_search, and:
+            checkpoint: a uw_hrp.checkpoint store, or the path of a json
+            file, recording the Next.Href and the number of records
+            yielded once each page is consumed. The same search restarted
+            with the checkpoint resumes from that page. The checkpoint is
+            removed when the search completes.
+        """
+        validate_fields(fields)
+        for data, persons in self._iter_result_pages(
+                kwargs, checkpoint, build=True, fields=fields):
+            for person in persons:
+                yield person
+
+    def iter_person_records(self, checkpoint=None, **kwargs):
+        """
+        Yields the raw person dicts of the search results, taking the
+        same parameters as iter_person_search except fields
+        """
+        for data, persons in self._iter_result_pages(kwargs, checkpoint):
+            for person_record in data.get("Persons") or []:
+                yield person_record
+
+    def iter_person_search_concurrent(self, max_workers=4, fields=None,
+                                      **kwargs):
+        """
+        Yields Person objects in the same order as iter_person_search.
+        After the first page, the remaining page urls are computed from
+        TotalCount and the page size hrpws returned, which may be less
+        than the page_size requested, and up to max_workers pages are
+        fetched concurrently, stopping at the first page without a
+        Next.Href. Without a TotalCount, or if the last computed page
+        still has a Next.Href, the rest of the pages are followed one at
+        a time.
+        """
+        validate_fields(fields)
+        url = self._search_url(kwargs)
+        data, persons = self._get_search_page(url, True, fields)
+        for person in persons:
+            yield person
+
+        next_url = get_next_href(data)
+        if next_url is None:
+            return
+
+        page_size = get_page_size(data)
+        if data.get("TotalCount") is not None and page_size:
+            last_page = math.ceil(int(data["TotalCount"]) / page_size)
+            page_urls = (get_page_href(next_url, page)
+                         for page in range(get_page_start(next_url),
+                                           last_page + 1))
+
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                pending = deque(
+                    executor.submit(
+                        self._get_search_page, page_url, True, fields)
+                    for page_url in islice(page_urls, max_workers))
+                while pending:
+                    data, persons = pending.popleft().result()
+                    page_url = next(page_urls, None)
+                    if page_url is not None:
+                        pending.append(executor.submit(
+                            self._get_search_page, page_url, True, fields))
+                    for person in persons:
+                        yield person
+                    next_url = get_next_href(data)
+                    if next_url is None:
+                        # TotalCount overstated the pages
+                        break
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if next_url is not None:
+            for data, persons in self._iter_search_pages(
+                    next_url, True, fields):
+                for person in persons:
+                    yield person
+
+    def _get_search_page(self, url, build=False, fields=None):
+        """
+        Returns (data, persons), the decoded json of the search result
+        page and, if build, its Person objects, built within the
+        request's Call so that the build stage is timed
+        """
+        call = self._start_call(url)
+        try:
+            data = self._get_data(call, url)
+            with call.stage("parse"):
+                data = json.loads(data)
+            person_records = data.get("Persons") or []
+            call.set_records(len(person_records))
+            persons = None
+            if build:
+                with call.stage("build"):
+                    persons = [self._person(person_record, fields)
+                               for person_record in person_records]
+            return data, persons
+        finally:
+            call.finish()
+
+    def _search_url(self, kwargs):
+        params = dict(kwargs)
+        params.setdefault("page_size", self.PAGE_SIZE)
+        return "{0}.json?{1}".format(self.URL_PREFIX, urlencode(params))
+
+    def _iter_result_pages(self, kwargs, checkpoint, build=False,
+                           fields=None):
+        url = self._search_url(kwargs)
+        if checkpoint is None:
+            return self._iter_search_pages(url, build, fields)
+        return self._iter_checkpointed_pages(url, checkpoint, build, fields)
+
+    def _iter_checkpointed_pages(self, url, store, build=False, fields=None):
+        if isinstance(store, str):
+            store = JSONFileCheckpointStore(store)
+
+        checkpoint = store.load(url) or {"next_url": url, "count": 0}
+        count = checkpoint["count"]
+        for data, persons in self._iter_search_pages(
+                checkpoint["next_url"], build, fields):
+            yield data, persons
+            count += len(data.get("Persons") or [])
+            next_url = get_next_href(data)
+            if next_url is not None:
+                store.save(url, {"next_url": next_url, "count": count})
+        store.delete(url)
+
+    def _iter_search_pages(self, url, build=False, fields=None):
+        """
+        Yields the (data, persons) of each search result page, as
+        returned by _get_search_page
+        """
+        while url:
+            data, persons = self._get_search_page(url, build, fields)
+            yield data, persons
+            url = get_next_href(data)
 
 
 def valid_uwnetid(netid):
@@ -110,3 +496,71 @@ def valid_employee_id(employee_id):
 
 def convert_bytes_str(data):
     return data.decode('utf-8') if type(data) is bytes else data
+
+
+def format_log_data(data, limit=None):
+    """
+    Returns the payload to log: in full when limit is None, only its size
+    when limit is 0, otherwise truncated to limit characters
+    """
+    if limit is None or len(data) <= int(limit):
+        return data
+    if int(limit) == 0:
+        return "({0} chars)".format(len(data))
+    return "{0}...({1} chars)".format(data[:int(limit)], len(data))
+
+
+def get_next_href(data):
+    if data.get("Next") and data["Next"].get("Href"):
+        return data["Next"]["Href"]
+    return None
+
+
+def get_page_size(data):
+    """
+    Returns the page size of the search result page, as returned by
+    hrpws or else the number of persons on it
+    """
+    current = data.get("Current") or {}
+    if current.get("PageSize"):
+        return int(current["PageSize"])
+    return len(data.get("Persons") or [])
+
+
+def get_page_start(url):
+    return int(dict(parse_qsl(urlsplit(url).query)).get("page_start", 1))
+
+
+def get_page_href(url, page_start):
+    """
+    Returns the given search url with its page_start set to page_start
+    """
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if "page_start" in dict(params):
+        params = [(k, page_start if k == "page_start" else v)
+                  for k, v in params]
+    else:
+        params.append(("page_start", page_start))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def get_response_header(response, name):
+    headers = getattr(response, "headers", None) or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def to_http_date(timestamp):
+    """
+    Returns the ISO 8601 timestamp as an HTTP date, or None
+    """
+    dt = parse_date(timestamp)
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
@@ -0,0 +1,106 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+This is the asyncio interface for interacting with the hrp web service.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from uw_hrp import HRP, get_next_href
+from uw_hrp.models import validate_fields
+
+
+class AsyncHRP(object):
+    """
+    Awaitable versions of the HRP lookups. restclients_core has no
+    non-blocking transport, so the DAO requests and the Person parsing
+    run on a thread pool the size of the hrpws connection pool, which
+    already bounds the concurrent upstream requests. Lookups beyond
+    that wait on the event loop, not in a thread, and concurrent
+    awaits of the same lookup share one.
+    """
+    def __init__(self, max_workers=None, **kwargs):
+        """
+        Other keyword arguments are passed to HRP
+        """
+        self.hrp = HRP(**kwargs)
+        if max_workers is None:
+            max_workers = int(self.hrp.DAO.get_service_setting(
+                "POOL_SIZE", self.hrp.DAO.get_setting(
+                    "DEFAULT_POOL_SIZE", 10)))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(
+            self.executor, func, *args)
+
+    async def _run_shared(self, func, *args):
+        """
+        Runs func(*args) on the executor, unless the same call is
+        already pending, and awaits its result. Cancelling one caller
+        leaves the call running for the others.
+        """
+        key = (func.__name__,) + tuple(
+            tuple(arg) if isinstance(arg, list) else arg for arg in args)
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = self._run(func, *args)
+            future.add_done_callback(
+                lambda future: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def get_person_by_employee_id(self, employee_id,
+                                        include_future=False,
+                                        use_cache=True, fields=None):
+        return await self._run_shared(self.hrp.get_person_by_employee_id,
+                                      employee_id, include_future,
+                                      use_cache, fields)
+
+    async def get_person_by_netid(self, netid, include_future=False,
+                                  use_cache=True, fields=None):
+        return await self._run_shared(self.hrp.get_person_by_netid,
+                                      netid, include_future, use_cache,
+                                      fields)
+
+    async def get_person_by_regid(self, regid, include_future=False,
+                                  use_cache=True, fields=None):
+        return await self._run_shared(self.hrp.get_person_by_regid,
+                                      regid, include_future, use_cache,
+                                      fields)
+
+    async def person_search(self, fields=None, **kwargs):
+        """
+        Asynchronously yields Person objects, taking the same parameters
+        as HRP.person_search. The next page is requested while the
+        current page is being consumed.
+        """
+        validate_fields(fields)
+        pending = self._run(
+            self._get_search_page, self.hrp._search_url(kwargs), fields)
+        try:
+            while pending is not None:
+                persons, next_url = await pending
+                pending = (
+                    self._run(self._get_search_page, next_url, fields)
+                    if next_url else None)
+                for person in persons:
+                    yield person
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def _get_search_page(self, url, fields):
+        data, persons = self.hrp._get_search_page(url, True, fields)
+        return persons, get_next_href(data)
@@ -0,0 +1,243 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Response caches for person lookups. HRP accepts any object with a
+get(key) method returning None on a miss and a set(key, value) method,
+and uses a get_stale(key) method, if any, to serve expired entries, a
+get_expired(key) method, if any, for the validators of an expired entry
+to revalidate, and a set_alias(alias, key) method, if any, so that a
+lookup of alias is served from the entry under key. SingleFlight shares
+one in-flight fetch among concurrent callers.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+
+class CachedPerson(namedtuple(
+        "CachedPerson", ("person", "etag", "last_modified"))):
+    """
+    A cached Person with the validators of the response it was built
+    from, for conditional requests
+    """
+    __slots__ = ()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class Alias(str):
+    """
+    The key of the entry that a BackendCache alias refers to
+    """
+    __slots__ = ()
+
+
+class LRUCache(object):
+    """
+    A thread-safe, in-process cache holding at most maxsize entries,
+    each expiring ttl seconds after it is set. The least recently used
+    entry is evicted when the cache is full. An expired entry is served
+    for a further stale_ttl seconds by get_stale, and is kept until it
+    is evicted, for get_expired. Aliases are kept apart from the
+    entries, do not count towards maxsize, and are dropped with the
+    entry they refer to.
+    """
+    def __init__(self, maxsize=1024, ttl=300, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._aliases = {}
+        self._aliases_of = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                now = time.monotonic()
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def get_stale(self, key):
+        """
+        Returns the value of an expired entry still within its stale_ttl,
+        or None
+        """
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                now = time.monotonic()
+                if expires + self.stale_ttl > now:
+                    if expires <= now:
+                        self.stale_hits += 1
+                    return value
+            return None
+
+    def get_expired(self, key):
+        """
+        Returns the value of the entry, expired or not, or None
+        """
+        with self._lock:
+            entry = self._entries.get(self._aliases.get(key, key))
+            return entry[1] if entry is not None else None
+
+    def set(self, key, value):
+        with self._lock:
+            self._aliases.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def set_alias(self, alias, key):
+        """
+        Serves lookups of alias from the entry under key, until that
+        entry is removed
+        """
+        with self._lock:
+            if key not in self._entries:
+                return
+            self._remove(alias)
+            self._aliases[alias] = key
+            self._aliases_of.setdefault(key, set()).add(alias)
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._aliases_of.clear()
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        for alias in self._aliases_of.pop(key, ()):
+            if self._aliases.get(alias) == key:
+                del self._aliases[alias]
+
+    def stats(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "size": len(self._entries)}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BackendCache(object):
+    """
+    Adapts an external cache backend with get(key) and
+    set(key, value, timeout) methods, such as a Django cache,
+    prefixing its keys and counting hits and misses. The values are
+    CachedPersons, which the backend may pickle; a lookup then returns
+    a copy of the cached Person.
+    """
+    def __init__(self, backend, ttl=300, prefix="uw_hrp:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.backend.get(self.prefix + key)
+        if isinstance(value, Alias):
+            value = self.backend.get(self.prefix + value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(self.prefix + key, value, self.ttl)
+
+    def set_alias(self, alias, key):
+        self.backend.set(self.prefix + alias, Alias(key), self.ttl)
+
+    def delete(self, key):
+        self.backend.delete(self.prefix + key)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class SingleFlight(object):
+    """
+    Collapses concurrent calls with the same key into one: the first
+    caller runs the function and the others wait for, and receive, its
+    result or exception.
+    """
+    flights = {}
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dao(cls, dao):
+        """
+        Returns the SingleFlight shared by the clients of the service
+        using the same DAO implementation, so that a stand-in DAO never
+        shares results with another
+        """
+        key = (dao.service_name(), type(dao.get_implementation()))
+        flight = cls.flights.get(key)
+        if flight is None:
+            flight = cls.flights.setdefault(key, cls())
+        return flight
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.shared += 1
+                leader = False
+            else:
+                self.calls += 1
+                future = self._futures[key] = Future()
+                leader = True
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as ex:
+            future.set_exception(ex)
+        finally:
+            with self._lock:
+                del self._futures[key]
+        return future.result()
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared}
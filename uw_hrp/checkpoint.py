@@ -0,0 +1,57 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Checkpoint stores for resuming long person searches. A store has
+load(key), returning None when there is no checkpoint, save(key,
+checkpoint) and delete(key) methods, with json-serializable checkpoints.
+"""
+
+import json
+import os
+import threading
+
+
+def load_json_file(path, default=None):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_json_file(path, data):
+    """
+    Writes data to a temporary file and renames it to path, so that path
+    is never left partially written
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class JSONFileCheckpointStore(object):
+    """
+    Keeps the checkpoints in a local json file
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        with self._lock:
+            return load_json_file(self.path, {}).get(key)
+
+    def save(self, key, checkpoint):
+        with self._lock:
+            checkpoints = load_json_file(self.path, {})
+            checkpoints[key] = checkpoint
+            save_json_file(self.path, checkpoints)
+
+    def delete(self, key):
+        with self._lock:
+            checkpoints = load_json_file(self.path, {})
+            if checkpoints.pop(key, None) is not None:
+                save_json_file(self.path, checkpoints)
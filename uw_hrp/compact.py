@@ -0,0 +1,194 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compact, immutable named tuple versions of the uw_hrp.models classes,
+with the same attribute names and to_json() output. They have no
+per-instance __dict__, for holding large search results in memory.
+"""
+
+from collections import namedtuple
+from uw_hrp.models import (
+    Person, date_to_str, parse_date, get_emp_program_job_class,
+    get_job_code, get_hr_org, get_netid, get_supervisor_eid,
+    get_supervisory_org, is_active_worker)
+
+
+class CompactEmploymentStatus(namedtuple("CompactEmploymentStatus", [
+        "status", "is_active", "is_retired", "is_terminated", "hire_date",
+        "retirement_date", "termination_date"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        if data is None:
+            return cls("", False, False, False, None, None, None)
+        return cls(data.get("EmployeeStatus"),
+                   data.get("Active"),
+                   data.get("Retired"),
+                   data.get("Terminated"),
+                   parse_date(data.get("HireDate")),
+                   parse_date(data.get("RetirementDate")),
+                   parse_date(data.get("TerminationDate")))
+
+    def to_json(self):
+        return {'status': self.status,
+                'hire_date': date_to_str(self.hire_date),
+                'is_active': self.is_active,
+                'is_retired': self.is_retired,
+                'is_terminated': self.is_terminated,
+                'retirement_date': date_to_str(self.retirement_date),
+                'termination_date': date_to_str(self.termination_date)}
+
+
+class CompactJobProfile(namedtuple("CompactJobProfile", [
+        "job_code", "description"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        if data is None:
+            return cls(None, None)
+        return cls(get_job_code(data.get("IDs")), data.get("Name"))
+
+    def to_json(self):
+        return {'job_code': self.job_code,
+                'description': self.description}
+
+
+class CompactEmploymentDetails(namedtuple("CompactEmploymentDetails", [
+        "start_date", "end_date", "hr_org", "job_class", "job_title",
+        "is_primary", "location", "org_code", "org_name", "org_unit_code",
+        "pos_type", "supervisor_eid", "job_profile"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        org_code, org_name = get_supervisory_org(data)
+
+        return cls(
+            start_date=parse_date(data.get("StartDate")),
+            end_date=parse_date(data.get("PositionVacateDate")),
+            hr_org=get_hr_org(data.get("OrganizationDetails")),
+            job_class=get_emp_program_job_class(
+                data.get("JobClassificationSummaries")),
+            job_title=data.get("BusinessTitle"),
+            is_primary=data.get("PrimaryPosition"),
+            location=(data["Location"].get("Name")
+                      if data.get("Location") is not None else None),
+            org_code=org_code,
+            org_name=org_name,
+            org_unit_code="",
+            pos_type=(data["PositionWorkerType"].get("Name")
+                      if data.get("PositionWorkerType") is not None
+                      else None),
+            supervisor_eid=get_supervisor_eid(data.get("Managers")),
+            job_profile=CompactJobProfile.from_data(data.get("JobProfile")))
+
+    def to_json(self):
+        return {'hr_org': self.hr_org,
+                'end_date': date_to_str(self.end_date),
+                'is_primary': self.is_primary,
+                'job_title': self.job_title,
+                'job_class': self.job_class,
+                'location': self.location,
+                'org_code': self.org_code,
+                'org_name': self.org_name,
+                'org_unit_code': self.org_unit_code,
+                'pos_type': self.pos_type,
+                'start_date': date_to_str(self.start_date),
+                'supervisor_eid': self.supervisor_eid,
+                'job_profile': (self.job_profile.to_json()
+                                if self.job_profile is not None else None)}
+
+
+class CompactWorkerDetails(namedtuple("CompactWorkerDetails", [
+        "worker_wid", "employee_status", "primary_job_title",
+        "primary_manager_id", "primary_position",
+        "other_active_positions"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        employee_status = CompactEmploymentStatus.from_data(
+            data.get("EmploymentStatus"))
+        primary_position = None
+        other_active_positions = []
+        if is_active_worker(data):
+            for emp_detail in data.get("EmploymentDetails"):
+                position = CompactEmploymentDetails.from_data(emp_detail)
+                if position.is_primary:
+                    primary_position = position
+                else:
+                    other_active_positions.append(position)
+
+        return cls(
+            worker_wid=data.get("WID"),
+            employee_status=employee_status,
+            primary_job_title=(primary_position.job_title
+                               if primary_position is not None else None),
+            primary_manager_id=(primary_position.supervisor_eid
+                                if primary_position is not None else None),
+            primary_position=primary_position,
+            other_active_positions=tuple(other_active_positions))
+
+    def to_json(self):
+        positions = []
+        if self.primary_position is not None:
+            positions.append(self.primary_position.to_json())
+        for pos in self.other_active_positions:
+            positions.append(pos.to_json())
+        return {'worker_wid': self.worker_wid,
+                'employee_status': self.employee_status.to_json(),
+                'primary_job_title': self.primary_job_title,
+                'primary_manager_id': self.primary_manager_id,
+                'active_positions': positions}
+
+
+class CompactPerson(namedtuple("CompactPerson", [
+        "netid", "regid", "employee_id", "student_id", "is_active",
+        "primary_manager_id", "prior_regids", "worker_details"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        netid = get_netid(data.get("IDs"))
+        student_id = None
+        prior_regids = []
+        for id in data.get("IDs"):
+            if id.get("Type") == "StudentID":
+                student_id = id.get("Value")
+            if id.get("Type") == "PriorRegID":
+                prior_regids.append(id.get("Value"))
+
+        primary_manager_id = None
+        worker_details = []
+        for wk_detail in data.get("WorkerDetails"):
+            worker = CompactWorkerDetails.from_data(wk_detail)
+            if is_active_worker(wk_detail):
+                worker_details.append(worker)
+            if worker.primary_manager_id is not None:
+                primary_manager_id = worker.primary_manager_id
+
+        return cls(
+            netid=netid,
+            regid=data.get("RegID"),
+            employee_id=data.get("EmployeeID"),
+            student_id=student_id,
+            is_active=len(worker_details) > 0,
+            primary_manager_id=primary_manager_id,
+            prior_regids=tuple(prior_regids),
+            worker_details=tuple(worker_details))
+
+    identifiers = Person.identifiers
+
+    def to_json(self):
+        return {'netid': self.netid,
+                'regid': self.regid,
+                'employee_id': self.employee_id,
+                'student_id': self.student_id,
+                'is_active': self.is_active,
+                'primary_manager_id': self.primary_manager_id,
+                'worker_details': [
+                    worker.to_json() for worker in self.worker_details]}
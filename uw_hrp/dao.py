@@ -4,8 +4,10 @@
 
 import logging
 import os
+import socket
 from os.path import abspath, dirname
-from restclients_core.dao import DAO
+from restclients_core.dao import DAO, LiveDAO
+from urllib3.connection import HTTPConnection
 
 
 class HRP_DAO(DAO):
@@ -15,5 +17,61 @@ class HRP_DAO(DAO):
     def service_mock_paths(self):
         return [abspath(os.path.join(dirname(__file__), "resources"))]
 
+    def get_default_service_setting(self, key):
+        if key == "POOL_BLOCK":
+            return True
+        if key == "KEEPALIVE":
+            return True
+
     def is_using_file_dao(self):
         return self.get_implementation().is_mock()
+
+    def _get_live_implementation(self):
+        return HRP_LiveDAO(self.service_name(), self)
+
+    def pool_stats(self):
+        """
+        Returns a dict of the live connection pool's request and new
+        connection counts, or None when not using the live DAO
+        """
+        implementation = self.get_implementation()
+        if not implementation.is_live():
+            return None
+        pool = implementation.get_pool()
+        return {
+            "requests": pool.num_requests,
+            "connections": pool.num_connections,
+            "reused": max(pool.num_requests - pool.num_connections, 0),
+            "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+        }
+
+    def close_pool(self):
+        """
+        Closes and discards the live connection pool, so the next
+        request builds a new one from the current settings
+        """
+        pool = LiveDAO.pools.pop(self.service_name(), None)
+        if pool is not None:
+            pool.close()
+
+
+class HRP_LiveDAO(LiveDAO):
+    """
+    Applies the POOL_BLOCK and KEEPALIVE settings to the connection pool.
+    POOL_SIZE sets the number of connections kept open to the host and,
+    while POOL_BLOCK is true, the maximum number of concurrent ones.
+    """
+    def create_pool(self):
+        pool = super(HRP_LiveDAO, self).create_pool()
+        pool.block = self._get_setting_bool("POOL_BLOCK")
+        if self._get_setting_bool("KEEPALIVE"):
+            pool.conn_kw["socket_options"] = (
+                HTTPConnection.default_socket_options +
+                [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+        return pool
+
+    def _get_setting_bool(self, key):
+        value = self.dao.get_service_setting(key)
+        if isinstance(value, str):
+            return value.lower() not in ("false", "0", "no", "")
+        return bool(value)
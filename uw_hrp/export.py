@@ -0,0 +1,125 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Streaming export of person search results as one row per active
+position, built from the raw person records without Person objects.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from uw_hrp import HRP
+from uw_hrp.models import (
+    date_to_str, parse_date, get_emp_program_job_class, get_job_code,
+    get_netid, get_supervisor_eid, get_supervisory_org, is_active_worker)
+
+POSITION_COLUMNS = (
+    "employee_id", "netid", "org_code", "org_name", "job_code", "job_class",
+    "pos_type", "start_date", "supervisor_eid", "is_primary")
+PositionRow = namedtuple("PositionRow", POSITION_COLUMNS)
+
+
+def iter_records(hrp=None, **kwargs):
+    """
+    Returns an iterator of the raw person records of a person search,
+    taking the HRP.iter_person_records parameters, made with hrp or a
+    new HRP
+    """
+    hrp = hrp if hrp is not None else HRP()
+    return hrp.iter_person_records(**kwargs)
+
+
+def iter_position_rows(person_records):
+    """
+    Yields a PositionRow, a namedtuple of the POSITION_COLUMNS, for each
+    active position of the given raw person records
+    """
+    for data in person_records:
+        netid = get_netid(data.get("IDs"))
+
+        for wk_detail in data.get("WorkerDetails"):
+            if not is_active_worker(wk_detail):
+                continue
+            for emp_detail in wk_detail.get("EmploymentDetails"):
+                org_code, org_name = get_supervisory_org(emp_detail)
+                job_profile = emp_detail.get("JobProfile") or {}
+                pos_type = emp_detail.get("PositionWorkerType") or {}
+                yield PositionRow(
+                    data.get("EmployeeID"),
+                    netid,
+                    org_code,
+                    org_name,
+                    get_job_code(job_profile.get("IDs")),
+                    get_emp_program_job_class(
+                        emp_detail.get("JobClassificationSummaries")),
+                    pos_type.get("Name"),
+                    date_to_str(parse_date(emp_detail.get("StartDate"))),
+                    get_supervisor_eid(emp_detail.get("Managers")),
+                    emp_detail.get("PrimaryPosition"),
+                )
+
+
+def write_csv(rows, fileobj):
+    """
+    Writes the rows to fileobj as CSV with a header, returning the number
+    of rows written
+    """
+    writer = csv.writer(fileobj)
+    writer.writerow(POSITION_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, fileobj):
+    """
+    Writes the rows to fileobj as JSON Lines, returning the number of
+    rows written
+    """
+    count = 0
+    for row in rows:
+        fileobj.write(json.dumps(dict(zip(POSITION_COLUMNS, row))))
+        fileobj.write("\n")
+        count += 1
+    return count
+
+
+def to_columns(rows, format="lists"):
+    """
+    Returns the rows as a dict of column name to column values. format
+    can be "lists", "numpy" for numpy arrays, or "arrow" for a
+    pyarrow.Table; numpy and pyarrow are optional dependencies.
+    """
+    columns = {name: [] for name in POSITION_COLUMNS}
+    appends = [columns[name].append for name in POSITION_COLUMNS]
+    for row in rows:
+        for append, value in zip(appends, row):
+            append(value)
+
+    if format == "lists":
+        return columns
+    if format == "numpy":
+        import numpy
+        return {name: numpy.array(values, dtype=object)
+                for name, values in columns.items()}
+    if format == "arrow":
+        import pyarrow
+        return pyarrow.table(columns)
+    raise ValueError("Invalid format: {0}".format(format))
+
+
+def export_positions(hrp, fileobj, format="csv", **kwargs):
+    """
+    Streams the positions of an hrp person search, taking the
+    iter_person_records parameters, to fileobj as "csv" or "jsonl".
+    Returns the number of rows written.
+    """
+    writers = {"csv": write_csv, "jsonl": write_jsonl}
+    if format not in writers:
+        raise ValueError("Invalid format: {0}".format(format))
+    return writers[format](
+        iter_position_rows(hrp.iter_person_records(**kwargs)), fileobj)
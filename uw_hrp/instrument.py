@@ -0,0 +1,136 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Per-request timing of hrpws calls. HRP(instrument=...) takes a callable
+that receives a Call for each request once it completes, for example a
+StageStats collector or a function feeding a metrics system. Without
+one, HRP uses NULL_CALL and the timing is skipped.
+"""
+
+import threading
+import time
+
+# fetch: the DAO request, including any retries
+# decode: bytes to str, parse: json.loads, build: the Person models
+STAGES = ("fetch", "decode", "parse", "build")
+OK_STATUSES = (200, 304)
+
+
+class Call(object):
+    """
+    The measurements of one hrpws request: its url, response or error
+    status (None for an error other than a DataFailureException), the
+    payload bytes, the number of person records, and the seconds spent
+    in each of the STAGES it went through.
+    """
+    __slots__ = ("url", "status", "bytes", "records", "timings",
+                 "_instrument")
+
+    def __init__(self, url, instrument):
+        self.url = url
+        self.status = None
+        self.bytes = 0
+        self.records = 0
+        self.timings = {}
+        self._instrument = instrument
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def set_response(self, response):
+        self.status = response.status
+        self.bytes = len(response.data or b"")
+
+    def set_status(self, status):
+        self.status = status
+
+    def set_records(self, records):
+        self.records = records
+
+    def finish(self):
+        self._instrument(self)
+
+
+class _Stage(object):
+    __slots__ = ("call", "name", "start")
+
+    def __init__(self, call, name):
+        self.call = call
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        timings = self.call.timings
+        timings[self.name] = (timings.get(self.name, 0.0) +
+                              time.perf_counter() - self.start)
+
+
+class _NullCall(object):
+    """
+    Stands in for a Call when instrumentation is off, ignoring the
+    measurements
+    """
+    __slots__ = ()
+
+    def stage(self, name):
+        return NULL_STAGE
+
+    def set_response(self, response):
+        pass
+
+    def set_status(self, status):
+        pass
+
+    def set_records(self, records):
+        pass
+
+    def finish(self):
+        pass
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_CALL = NULL_STAGE = _NullCall()
+
+
+class StageStats(object):
+    """
+    An instrument aggregating Calls: the number of calls, total seconds
+    per stage, payload bytes, person records, and errors by status
+    """
+    def __init__(self):
+        self.calls = 0
+        self.timings = dict.fromkeys(STAGES, 0.0)
+        self.bytes = 0
+        self.records = 0
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, call):
+        with self._lock:
+            self.calls += 1
+            for name, seconds in call.timings.items():
+                self.timings[name] = self.timings.get(name, 0.0) + seconds
+            self.bytes += call.bytes
+            self.records += call.records
+            if call.status not in OK_STATUSES:
+                self.errors[call.status] = self.errors.get(
+                    call.status, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "timings": dict(self.timings),
+                "bytes": self.bytes,
+                "records": self.records,
+                "errors": dict(self.errors),
+            }
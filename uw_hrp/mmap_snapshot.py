@@ -0,0 +1,171 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A read-only person snapshot file that is memory-mapped, so the worker
+processes reading it share one copy through the page cache and records
+are only decoded on lookup.
+
+File layout:
+    MAGIC, then the offset of the directory as an unsigned 64-bit int
+    the json of each person record, concatenated
+    for each key type, the key bytes, then a table of fixed width slots,
+        sorted by key: (key offset, key length, record offset,
+        record length)
+    the directory: json of the watermark, record count and, for each key
+        type, the offset and length of its slot table
+"""
+
+import json
+import mmap
+import os
+import struct
+from uw_hrp.export import iter_records
+from uw_hrp.snapshot import ID_KEY_TYPES, KEY_TYPES, get_index_keys
+from uw_hrp.sync import latest_timestamp
+
+MAGIC = b"UWHRPSN1"
+HEADER = struct.Struct("<8sQ")
+SLOT = struct.Struct("<QHQI")
+
+
+def write_mmap_snapshot(path, records):
+    """
+    Writes the raw person records as a snapshot file at path, replacing
+    any existing file. Only the index keys are held in memory. A person
+    appearing more than once, by RegID or else EmployeeID as in
+    PersonSnapshot, is indexed by their last record only.
+    """
+    entries = {key_type: [] for key_type in KEY_TYPES}
+    latest = {}
+    superseded = set()
+    watermark = None
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0))
+        for data in records:
+            record = json.dumps(data).encode("utf-8")
+            record_offset = f.tell()
+            f.write(record)
+            person_key = data.get("RegID") or data.get("EmployeeID")
+            if person_key in latest:
+                superseded.add(latest[person_key])
+            latest[person_key] = record_offset
+            for key_type, value in get_index_keys(data):
+                entries[key_type].append(
+                    (value.encode("utf-8"), record_offset, len(record)))
+            watermark = latest_timestamp(
+                watermark, data.get("RepositoryTimeStamp"))
+
+        count = len(latest)
+        indexes = {}
+        for key_type, key_entries in entries.items():
+            key_entries = sorted(entry for entry in key_entries
+                                 if entry[1] not in superseded)
+            key_offsets = []
+            for key, record_offset, record_len in key_entries:
+                key_offsets.append(f.tell())
+                f.write(key)
+            indexes[key_type] = [f.tell(), len(key_entries)]
+            for key_offset, (key, record_offset, record_len) in zip(
+                    key_offsets, key_entries):
+                f.write(SLOT.pack(
+                    key_offset, len(key), record_offset, record_len))
+
+        directory_offset = f.tell()
+        f.write(json.dumps({"watermark": watermark,
+                            "count": count,
+                            "indexes": indexes}).encode("utf-8"))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, directory_offset))
+    os.replace(tmp_path, path)
+    return count
+
+
+class MmapSnapshot(object):
+    """
+    Reads a snapshot file written by write_mmap_snapshot. Provides the
+    get_record and find_records lookups of uw_hrp.snapshot.PersonSnapshot,
+    so it can back a SnapshotHRP.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, directory_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a person snapshot file: {0}".format(path))
+        directory = json.loads(self._mm[directory_offset:])
+        self.watermark = directory["watermark"]
+        self._count = directory["count"]
+        self._indexes = directory["indexes"]
+
+    @classmethod
+    def build(cls, path, hrp=None, **kwargs):
+        """
+        Streams a person search, taking the iter_person_records
+        parameters, into a snapshot file at path, and opens it
+        """
+        write_mmap_snapshot(path, iter_records(hrp, **kwargs))
+        return cls(path)
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _slot(self, table_offset, index):
+        return SLOT.unpack_from(self._mm, table_offset + index * SLOT.size)
+
+    def _key(self, table_offset, index):
+        key_offset, key_len, record_offset, record_len = self._slot(
+            table_offset, index)
+        return self._mm[key_offset:key_offset + key_len]
+
+    def _find(self, key_type, value):
+        # binary search the key type's sorted slots for the value
+        table_offset, count = self._indexes[key_type]
+        key = str(value).lower().encode("utf-8")
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(table_offset, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < count and self._key(table_offset, lo) == key:
+            key_offset, key_len, record_offset, record_len = self._slot(
+                table_offset, lo)
+            yield record_offset, record_len
+            lo += 1
+
+    def _record(self, record_offset, record_len):
+        return json.loads(self._mm[record_offset:record_offset + record_len])
+
+    def get_record(self, id, key_types=ID_KEY_TYPES):
+        """
+        Returns the raw person record with the id as any of key_types,
+        or None
+        """
+        for key_type in key_types:
+            for record_offset, record_len in self._find(key_type, id):
+                return self._record(record_offset, record_len)
+        return None
+
+    def find_records(self, key_type, value):
+        """
+        Returns the raw person records indexed by the key_type value
+        """
+        if key_type not in KEY_TYPES:
+            raise ValueError("Invalid key type: {0}".format(key_type))
+        return [self._record(record_offset, record_len)
+                for record_offset, record_len in self._find(key_type, value)]
@@ -2,7 +2,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+from datetime import datetime
 from dateutil.parser import parse
+from functools import lru_cache
 import json
 from restclients_core import models
 
@@ -15,10 +17,19 @@ def date_to_str(d_obj):
 
 def parse_date(date_str):
     if date_str is not None:
-        return parse(date_str)
+        return _parse_date_str(date_str)
     return None
 
 
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_str):
+    # hrp sends ISO 8601 dates, such as 2006-05-16T00:00:00-07:00
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        return parse(date_str)
+
+
 def get_emp_program_job_class(job_classification_summaries):
     # process JobClassificationSummaries, extract employment program job code
     if job_classification_summaries and len(job_classification_summaries) > 0:
@@ -34,6 +45,72 @@ def get_emp_program_job_class(job_classification_summaries):
                 return emp_program_name.strip()
 
 
+def get_supervisor_eid(managers):
+    # process Managers, extract the first manager's employee id
+    supervisor_eid = None
+    if managers is not None and len(managers) > 0:
+        for id_data in managers[0].get("IDs"):
+            if id_data.get("Type") == "Employee_ID":
+                supervisor_eid = id_data.get("Value")
+    return supervisor_eid
+
+
+def is_active_worker(worker_details):
+    emp_status = worker_details.get("EmploymentStatus")
+    return bool(emp_status and emp_status.get("Active"))
+
+
+def get_primary_manager_id(worker_details):
+    # the supervisor of an active worker's primary position
+    manager_id = None
+    if is_active_worker(worker_details):
+        for emp_detail in worker_details.get("EmploymentDetails"):
+            if emp_detail.get("PrimaryPosition"):
+                manager_id = get_supervisor_eid(emp_detail.get("Managers"))
+    return manager_id
+
+
+def get_job_code(job_profile_ids):
+    # process JobProfile IDs, extract the job profile id
+    job_code = None
+    if job_profile_ids is not None and len(job_profile_ids):
+        for id_data in job_profile_ids:
+            if id_data.get("Type") == "Job_Profile_ID":
+                job_code = id_data.get("Value")
+    return job_code
+
+
+def get_hr_org(organization_details):
+    # process OrganizationDetails, extract the HR Org name
+    hr_org = ""
+    if organization_details is not None and len(organization_details):
+        for org_det in organization_details:
+            if (org_det.get("Organization") is not None and
+                    org_det["Organization"].get("Name") is not None and
+                    org_det.get("Type") is not None and
+                    org_det["Type"].get("Name") == "HR Org"):
+                hr_org = org_det["Organization"]["Name"]
+    return hr_org
+
+
+def get_supervisory_org(emp_detail):
+    # process SupervisoryOrganization, extract the org code and name
+    supervisory_org = emp_detail.get("SupervisoryOrganization")
+    if supervisory_org and supervisory_org.get("Name") is not None:
+        return get_org_code_name(supervisory_org["Name"])
+    return "", ""
+
+
+def get_netid(ids):
+    # process the person IDs, extract the NetID
+    netid = ""
+    if ids is not None:
+        for id_data in ids:
+            if id_data.get("Type") == "NetID":
+                netid = id_data.get("Value")
+    return netid
+
+
 def get_org_code_name(organization_name):
     org_code = ""
     org_name = organization_name
@@ -45,7 +122,45 @@ def get_org_code_name(organization_name):
     return org_code.strip(), org_name.strip()
 
 
-class EmploymentStatus(models.Model):
+@lru_cache(maxsize=None)
+def _model_fields(model_class):
+    # the (name, field) of each of the model class's fields
+    fields = {}
+    for klass in reversed(model_class.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, models.BaseField):
+                fields[name] = value
+    return tuple(fields.items())
+
+
+class PicklableModel(models.Model):
+    """
+    A Model that can be pickled, as by an external cache. restclients_core
+    keeps the field values under keys made from the field's id() and the
+    fields in a set of weakrefs; the values are pickled by field name
+    instead, and set through the fields again when unpickled.
+    """
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("initialized", None)
+        state.pop("_dynamic_fields", None)
+        field_values = state.pop("_field_values", {})
+        values = {}
+        for name, field in _model_fields(type(self)):
+            key = field._key_for_instance(field)
+            if key in field_values:
+                values[name] = field_values[key]
+        return state, values
+
+    def __setstate__(self, state):
+        state, values = state
+        self._init()
+        self.__dict__.update(state)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+class EmploymentStatus(PicklableModel):
     status = models.CharField(max_length=32)
     is_active = models.BooleanField(default=False)
     is_retired = models.BooleanField(default=False)
@@ -80,7 +195,7 @@ class EmploymentStatus(models.Model):
         return json.dumps(self.to_json())
 
 
-class JobProfile(models.Model):
+class JobProfile(PicklableModel):
     job_code = models.CharField(max_length=16, null=True, default=None)
     description = models.CharField(max_length=96, null=True, default=None)
 
@@ -96,17 +211,13 @@ class JobProfile(models.Model):
             return super(JobProfile, self).__init__(*args, **kwargs)
 
         self.description = data.get("Name")
-        ids = data.get("IDs")
-        if ids is not None and len(ids):
-            for id_data in ids:
-                if id_data.get("Type") == "Job_Profile_ID":
-                    self.job_code = id_data.get("Value")
+        self.job_code = get_job_code(data.get("IDs"))
 
     def __str__(self):
         return json.dumps(self.to_json())
 
 
-class EmploymentDetails(models.Model):
+class EmploymentDetails(PicklableModel):
     start_date = models.DateTimeField(null=True, default=None)
     end_date = models.DateTimeField(null=True, default=None)
     hr_org = models.CharField(max_length=96, default="")
@@ -160,21 +271,9 @@ class EmploymentDetails(models.Model):
         if data.get("Location") is not None:
             self.location = data["Location"].get("Name")
 
-        managers = data.get("Managers")
-        if managers is not None and len(managers) > 0:
-            ids = managers[0].get("IDs")
-            for id_data in ids:
-                if id_data.get("Type") == "Employee_ID":
-                    self.supervisor_eid = id_data.get("Value")
-
-        if (data.get("OrganizationDetails") is not None and
-                len(data["OrganizationDetails"])):
-            for org_det in data["OrganizationDetails"]:
-                if (org_det.get("Organization") is not None and
-                        org_det["Organization"].get("Name") is not None and
-                        org_det.get("Type") is not None and
-                        org_det["Type"].get("Name") == "HR Org"):
-                    self.hr_org = org_det["Organization"]["Name"]
+        self.supervisor_eid = get_supervisor_eid(data.get("Managers"))
+
+        self.hr_org = get_hr_org(data.get("OrganizationDetails"))
 
         if data.get("PositionWorkerType") is not None:
             self.pos_type = data["PositionWorkerType"].get("Name")
@@ -182,14 +281,21 @@ class EmploymentDetails(models.Model):
         self.is_primary = data.get("PrimaryPosition")
         self.end_date = parse_date(data.get("PositionVacateDate"))
         self.start_date = parse_date(data.get("StartDate"))
+        self.org_code, self.org_name = get_supervisory_org(data)
+
+
+# The parts of WorkerDetails that can be selected with fields
+WORKER_FIELDS = ("employment_status", "primary_position", "other_positions")
 
-        if (data.get("SupervisoryOrganization") and
-                data["SupervisoryOrganization"].get("Name") is not None):
-            self.org_code, self.org_name = get_org_code_name(
-                data["SupervisoryOrganization"]["Name"])
 
+def validate_fields(fields):
+    if fields is not None:
+        for field in fields:
+            if field not in WORKER_FIELDS:
+                raise ValueError("Invalid field: {0}".format(field))
 
-class WorkerDetails(models.Model):
+
+class WorkerDetails(PicklableModel):
     worker_wid = models.CharField(max_length=32)
     primary_job_title = models.CharField(
         max_length=128, null=True, default=None)
@@ -218,7 +324,11 @@ class WorkerDetails(models.Model):
         return json.dumps(self.to_json())
 
     def __init__(self, *args, **kwargs):
+        """
+        fields: optional collection of the WORKER_FIELDS to build
+        """
         data = kwargs.get("data")
+        fields = kwargs.pop("fields", None)
         self.employee_status = None
         self.primary_position = None  # only 1 primary position
         self.other_active_positions = []  # include the future position
@@ -228,13 +338,23 @@ class WorkerDetails(models.Model):
 
         self.worker_wid = data.get("WID")
 
-        self.employee_status = EmploymentStatus(
-            data=data.get("EmploymentStatus"))
+        if fields is None or "employment_status" in fields:
+            self.employee_status = EmploymentStatus(
+                data=data.get("EmploymentStatus"))
 
-        if not (self.employee_status and self.employee_status.is_active):
+        if not is_active_worker(data):
             return
 
         for emp_detail in data.get("EmploymentDetails"):
+            if fields is not None and (
+                    ("primary_position" if emp_detail.get("PrimaryPosition")
+                     else "other_positions") not in fields):
+                if emp_detail.get("PrimaryPosition"):
+                    self.primary_job_title = emp_detail.get("BusinessTitle")
+                    self.primary_manager_id = get_supervisor_eid(
+                        emp_detail.get("Managers"))
+                continue
+
             position = EmploymentDetails(data=emp_detail)
             if position and position.is_primary:
                 self.primary_job_title = position.job_title
@@ -244,7 +364,7 @@ class WorkerDetails(models.Model):
                 self.other_active_positions.append(position)
 
 
-class Person(models.Model):
+class Person(PicklableModel):
     netid = models.CharField(max_length=32)
     regid = models.CharField(max_length=32)
     employee_id = models.CharField(max_length=16)
@@ -272,26 +392,88 @@ class Person(models.Model):
     def __str__(self):
         return json.dumps(self.to_json())
 
+    def identifiers(self):
+        """
+        Returns the ids the person can be looked up by: netid, regid,
+        employee_id and prior regids
+        """
+        ids = [self.netid, self.regid, self.employee_id]
+        ids.extend(self.prior_regids)
+        return [id for id in ids if id]
+
     def __init__(self, *args, **kwargs):
+        """
+        With lazy=True, only the ids, is_active and primary_manager_id
+        are extracted from data; the worker_details are built when first
+        accessed.
+        fields: optional collection of the WORKER_FIELDS to build in each
+        worker_details. The ids, is_active and primary_manager_id are
+        always extracted; with no fields, no worker_details are built.
+        """
         data = kwargs.get("data")
-        self.worker_details = []
+        lazy = kwargs.pop("lazy", False)
+        self._fields = kwargs.pop("fields", None)
+        validate_fields(self._fields)
+        self.prior_regids = []
         if data is None:
+            self.worker_details = []
             return super(Person, self).__init__(*args, **kwargs)
 
         self.employee_id = data.get("EmployeeID")
         self.regid = data.get("RegID")
 
+        self.netid = get_netid(data.get("IDs"))
         for id in data.get("IDs"):
-            if id.get("Type") == "NetID":
-                self.netid = id.get("Value")
             if id.get("Type") == "StudentID":
                 self.student_id = id.get("Value")
+            if id.get("Type") == "PriorRegID":
+                self.prior_regids.append(id.get("Value"))
+
+        if self._fields is not None and not len(self._fields):
+            self._extract_worker_summary(data.get("WorkerDetails"))
+            self.worker_details = []
+            return
+
+        if lazy:
+            self._extract_worker_summary(data.get("WorkerDetails"))
+            self._worker_details_data = data.get("WorkerDetails")
+            return
 
-        for wk_detail in data.get("WorkerDetails"):
-            worker_obj = WorkerDetails(data=wk_detail)
-            if (worker_obj and worker_obj.employee_status and
-                    worker_obj.employee_status.is_active):
+        self.worker_details = self._build_worker_details(
+            data.get("WorkerDetails"))
+
+    def __getattr__(self, name):
+        # build the worker_details of a lazily parsed person
+        if name == "worker_details":
+            data = self.__dict__.get("_worker_details_data")
+            if data is not None:
+                # threads first accessing it together may each build it,
+                # but all of them get the one stored first
+                worker_details = self.__dict__.setdefault(
+                    "worker_details", self._build_worker_details(data))
+                self.__dict__.pop("_worker_details_data", None)
+                return worker_details
+            if "worker_details" in self.__dict__:
+                # built by another thread since this lookup
+                return self.__dict__["worker_details"]
+        raise AttributeError(name)
+
+    def _extract_worker_summary(self, worker_details_data):
+        # set is_active and primary_manager_id without building models
+        for wk_detail in worker_details_data:
+            if is_active_worker(wk_detail):
+                self.is_active = True
+            manager_id = get_primary_manager_id(wk_detail)
+            if manager_id is not None:
+                self.primary_manager_id = manager_id
+
+    def _build_worker_details(self, worker_details_data):
+        worker_details = []
+        for wk_detail in worker_details_data:
+            worker_obj = WorkerDetails(data=wk_detail, fields=self._fields)
+            if is_active_worker(wk_detail):
                 self.is_active = True
-                self.worker_details.append(worker_obj)
+                worker_details.append(worker_obj)
             if worker_obj.primary_manager_id is not None:
                 self.primary_manager_id = worker_obj.primary_manager_id
+        return worker_details
@@ -0,0 +1,297 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+In-memory indexes of reporting lines and organizations, each built in a
+single pass over a stream of raw person records.
+"""
+
+from collections import Counter
+from uw_hrp.export import iter_position_rows, iter_records
+from uw_hrp.models import (
+    get_emp_program_job_class, get_hr_org, get_supervisory_org,
+    is_active_worker)
+
+ORG_KEY_TYPES = ("org_code", "hr_org")
+COUNT_TYPES = ("pos_type", "job_class", "active")
+
+
+class ReportingCycleError(ValueError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super(ReportingCycleError, self).__init__(
+            "Reporting cycle: {0}".format(" -> ".join(cycle)))
+
+
+class _RecordIndex(object):
+    """
+    An index of raw person records, each added by the subclass's
+    add_record
+    """
+    @classmethod
+    def build(cls, hrp=None, **kwargs):
+        """
+        Returns an index built in one pass over a person search, taking
+        the iter_person_records parameters
+        """
+        index = cls()
+        index.add_records(iter_records(hrp, **kwargs))
+        return index
+
+    def add_records(self, records):
+        for data in records:
+            self.add_record(data)
+
+
+class ReportingIndex(_RecordIndex):
+    """
+    Maps each manager's employee id to their direct reports, whose
+    active positions have that supervisor_eid, and each employee to
+    their primary manager, the supervisor of their primary position.
+    Also tracks each employee's org_codes.
+    """
+    def __init__(self):
+        self._managers = {}
+        self._supervisors = {}
+        self._reports = {}
+        self._orgs = {}
+        self._members = {}
+
+    def add_record(self, data):
+        """
+        Adds the raw person record, replacing any earlier version
+        """
+        employee_id = data.get("EmployeeID")
+        self.remove(employee_id)
+
+        manager_id = None
+        supervisors = set()
+        orgs = set()
+        for row in iter_position_rows([data]):
+            if row.supervisor_eid:
+                supervisors.add(row.supervisor_eid)
+                if row.is_primary:
+                    manager_id = row.supervisor_eid
+            if row.org_code:
+                orgs.add(row.org_code)
+
+        if manager_id is not None:
+            self._managers[employee_id] = manager_id
+        self._supervisors[employee_id] = frozenset(supervisors)
+        for supervisor_eid in supervisors:
+            self._add(self._reports, supervisor_eid, employee_id)
+        self._orgs[employee_id] = frozenset(orgs)
+        for org_code in orgs:
+            self._add(self._members, org_code, employee_id)
+
+    def remove(self, employee_id):
+        self._managers.pop(employee_id, None)
+        for supervisor_eid in self._supervisors.pop(employee_id, ()):
+            self._discard(self._reports, supervisor_eid, employee_id)
+        for org_code in self._orgs.pop(employee_id, ()):
+            self._discard(self._members, org_code, employee_id)
+
+    # A set of employee ids is frozen by its first lookup, which then
+    # returns the stored frozenset, and thawed by its next change, so
+    # that building an index stays linear.
+    def _add(self, index, key, employee_id):
+        members = index.get(key)
+        if members is None:
+            members = index[key] = set()
+        elif isinstance(members, frozenset):
+            members = index[key] = set(members)
+        members.add(employee_id)
+
+    def _discard(self, index, key, employee_id):
+        members = index.get(key)
+        if members is None:
+            return
+        if isinstance(members, frozenset):
+            members = index[key] = set(members)
+        members.discard(employee_id)
+        if not members:
+            del index[key]
+
+    def _lookup(self, index, key):
+        members = index.get(key)
+        if members is None:
+            return frozenset()
+        if not isinstance(members, frozenset):
+            members = index[key] = frozenset(members)
+        return members
+
+    def __len__(self):
+        return len(self._supervisors)
+
+    def direct_reports(self, employee_id):
+        """
+        Returns the frozenset of employee ids reporting to employee_id
+        """
+        return self._lookup(self._reports, employee_id)
+
+    def primary_manager(self, employee_id):
+        return self._managers.get(employee_id)
+
+    def management_chain(self, employee_id):
+        """
+        Returns the list of employee_id's managers, from their primary
+        manager up. Raises ReportingCycleError if the chain loops.
+        """
+        chain = []
+        visited = set([employee_id])
+        manager_id = self._managers.get(employee_id)
+        while manager_id is not None:
+            if manager_id in visited:
+                cycle = chain[chain.index(manager_id):] if (
+                    manager_id in chain) else [employee_id] + chain
+                raise ReportingCycleError(cycle + [manager_id])
+            chain.append(manager_id)
+            visited.add(manager_id)
+            manager_id = self._managers.get(manager_id)
+        return chain
+
+    def find_cycles(self):
+        """
+        Returns a list of the primary manager cycles, each a list of
+        employee ids
+        """
+        cycles = []
+        done = set()
+        for employee_id in self._managers:
+            path = []
+            on_path = {}
+            current = employee_id
+            while current is not None and current not in done:
+                if current in on_path:
+                    cycles.append(path[on_path[current]:])
+                    break
+                on_path[current] = len(path)
+                path.append(current)
+                current = self._managers.get(current)
+            done.update(path)
+        return cycles
+
+    def org_members(self, org_code):
+        """
+        Returns the frozenset of employee ids with an active position in
+        the org_code
+        """
+        return self._lookup(self._members, org_code)
+
+    def orgs(self, employee_id):
+        return self._orgs.get(employee_id, frozenset())
+
+
+class OrgIndex(_RecordIndex):
+    """
+    Maps each org_code and hr_org to the employee ids with a position in
+    it, with per-org position counts by pos_type, job_class and active
+    status. Inactive positions are included and counted as such.
+    """
+    def __init__(self):
+        self._orgs = dict((key_type, {}) for key_type in ORG_KEY_TYPES)
+        self._positions = {}
+
+    def add_record(self, data):
+        """
+        Adds the raw person record, replacing any earlier version
+        """
+        employee_id = data.get("EmployeeID")
+        self.remove(employee_id)
+
+        positions = []
+        for wk_detail in data.get("WorkerDetails") or []:
+            active = is_active_worker(wk_detail)
+            for emp_detail in wk_detail.get("EmploymentDetails") or []:
+                org_code = get_supervisory_org(emp_detail)[0]
+                pos_type = emp_detail.get("PositionWorkerType") or {}
+                positions.append((
+                    (org_code,
+                     get_hr_org(emp_detail.get("OrganizationDetails"))),
+                    (pos_type.get("Name"),
+                     get_emp_program_job_class(
+                         emp_detail.get("JobClassificationSummaries")),
+                     active)))
+
+        for keys, values in positions:
+            for key_type, key in zip(ORG_KEY_TYPES, keys):
+                if key:
+                    org = self._orgs[key_type].setdefault(key, _OrgEntry())
+                    org.add(employee_id, values)
+        self._positions[employee_id] = positions
+
+    def remove(self, employee_id):
+        for keys, values in self._positions.pop(employee_id, ()):
+            for key_type, key in zip(ORG_KEY_TYPES, keys):
+                orgs = self._orgs[key_type]
+                org = orgs.get(key)
+                if org is not None:
+                    org.remove(employee_id, values)
+                    if not org.members:
+                        del orgs[key]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def orgs(self, key_type="org_code"):
+        """
+        Returns the list of org_codes or hr_orgs in the index
+        """
+        return sorted(self._get_orgs(key_type))
+
+    def members(self, key, key_type="org_code"):
+        """
+        Returns the frozenset of employee ids with a position in the org
+        """
+        org = self._get_orgs(key_type).get(key)
+        return org.frozen_members() if org is not None else frozenset()
+
+    def counts(self, key, by="pos_type", key_type="org_code"):
+        """
+        Returns a dict of the org's position counts by one of the
+        COUNT_TYPES
+        """
+        if by not in COUNT_TYPES:
+            raise ValueError("Invalid count type: {0}".format(by))
+        org = self._get_orgs(key_type).get(key)
+        if org is None:
+            return {}
+        return dict(org.counts[COUNT_TYPES.index(by)])
+
+    def _get_orgs(self, key_type):
+        if key_type not in self._orgs:
+            raise ValueError("Invalid org key type: {0}".format(key_type))
+        return self._orgs[key_type]
+
+
+class _OrgEntry(object):
+    __slots__ = ("members", "counts", "_frozen")
+
+    def __init__(self):
+        # employee id -> number of positions in the org
+        self.members = Counter()
+        self.counts = tuple(Counter() for _ in COUNT_TYPES)
+        self._frozen = None
+
+    def frozen_members(self):
+        # kept until the members change
+        if self._frozen is None:
+            self._frozen = frozenset(self.members)
+        return self._frozen
+
+    def add(self, employee_id, values):
+        self._frozen = None
+        self.members[employee_id] += 1
+        for counter, value in zip(self.counts, values):
+            counter[value] += 1
+
+    def remove(self, employee_id, values):
+        self._frozen = None
+        self.members[employee_id] -= 1
+        if self.members[employee_id] <= 0:
+            del self.members[employee_id]
+        for counter, value in zip(self.counts, values):
+            counter[value] -= 1
+            if counter[value] <= 0:
+                del counter[value]
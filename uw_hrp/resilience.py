@@ -0,0 +1,258 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Retries of transient hrpws failures, with exponential backoff, jitter
+and a retry budget shared per service, and a circuit breaker that fails fast
+while hrpws is failing or slow.
+"""
+
+import logging
+import random
+import threading
+import time
+from restclients_core.exceptions import DataFailureException
+
+logger = logging.getLogger(__name__)
+# status 0 is a connection error or timeout raised by the live DAO
+RETRY_STATUSES = (0, 429, 500, 502, 503, 504)
+
+
+class RetryBudget(object):
+    """
+    A token bucket limiting retries to a fraction of requests: each
+    request deposits ratio tokens, up to max_tokens, and each retry
+    withdraws one. The bucket starts full so that a new client can
+    retry a few early failures.
+    """
+    def __init__(self, ratio=0.1, max_tokens=10):
+        self.ratio = float(ratio)
+        self.max_tokens = float(max_tokens)
+        self._tokens = self.max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """
+        Returns True if a retry is allowed
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self):
+        return self._tokens
+
+
+class RetryPolicy(object):
+    """
+    Retries a call failing with a DataFailureException whose status is
+    in statuses, at most retries times, sleeping a random (full jitter)
+    delay between 0 and min(max_backoff, backoff * 2 ** attempt) before
+    each retry. Retries stop early when the budget is exhausted.
+    """
+    budgets = {}
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30,
+                 statuses=RETRY_STATUSES, budget=None, jitter=True):
+        self.retries = int(retries)
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.statuses = frozenset(statuses)
+        self.budget = budget if budget is not None else RetryBudget()
+        self.jitter = jitter
+        self.sleep = time.sleep
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.budget_exhausted = 0
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dao(cls, dao):
+        """
+        Returns a RetryPolicy from the RETRIES, RETRY_BACKOFF,
+        RETRY_MAX_BACKOFF and RETRY_BUDGET_RATIO service settings, or
+        None if RETRIES is not set. The policies share one RetryBudget
+        per service, so that clients created per use are limited too.
+        """
+        retries = int(dao.get_service_setting("RETRIES", 0) or 0)
+        if retries <= 0:
+            return None
+        service = dao.service_name()
+        budget = cls.budgets.get(service)
+        if budget is None:
+            budget = cls.budgets.setdefault(service, RetryBudget(
+                ratio=dao.get_service_setting("RETRY_BUDGET_RATIO", 0.1)))
+        return cls(
+            retries=retries,
+            backoff=dao.get_service_setting("RETRY_BACKOFF", 0.5),
+            max_backoff=dao.get_service_setting("RETRY_MAX_BACKOFF", 30),
+            budget=budget)
+
+    def call(self, func, *args, **kwargs):
+        self.budget.deposit()
+        self._count("requests")
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except DataFailureException as ex:
+                if ex.status not in self.statuses or attempt >= self.retries:
+                    self._count("failures")
+                    raise
+                if not self.budget.withdraw():
+                    self._count("budget_exhausted")
+                    self._count("failures")
+                    raise
+                delay = self.get_delay(attempt)
+                logger.info("Retry %s of %s in %.2fs: %s %s", attempt + 1,
+                            ex.url, delay, ex.status, ex.msg)
+                self._count("retried", delay=delay)
+                self.sleep(delay)
+                attempt += 1
+
+    def get_delay(self, attempt):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _count(self, name, delay=0.0):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self.delay += delay
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retried,
+            "failures": self.failures,
+            "budget_exhausted": self.budget_exhausted,
+            "retry_delay": self.delay,
+            "budget_tokens": self.budget.tokens,
+        }
+
+
+class CircuitOpenError(DataFailureException):
+    def __init__(self, url):
+        super(CircuitOpenError, self).__init__(
+            url, 503, "Circuit breaker open")
+
+
+class CircuitBreaker(object):
+    """
+    Opens after failure_threshold consecutive failures, a failure being
+    a DataFailureException with a status in statuses, any other error,
+    or a call taking longer than latency_threshold seconds. While open,
+    calls fail fast with CircuitOpenError. After reset_timeout seconds
+    one trial call is let through (half-open): its success closes the
+    breaker and its failure opens it again. A call that succeeds while
+    the breaker is open, having started before it opened, leaves it
+    open.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    breakers = {}
+
+    def __init__(self, failure_threshold=5, latency_threshold=None,
+                 reset_timeout=30, statuses=RETRY_STATUSES):
+        self.failure_threshold = int(failure_threshold)
+        self.latency_threshold = (
+            float(latency_threshold) if latency_threshold else None)
+        self.reset_timeout = float(reset_timeout)
+        self.statuses = frozenset(statuses)
+        self.clock = time.monotonic
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dao(cls, dao):
+        """
+        Returns the breaker shared by the service's clients, built from
+        the BREAKER_FAILURES, BREAKER_LATENCY and BREAKER_RESET_TIMEOUT
+        service settings, or None if BREAKER_FAILURES is not set
+        """
+        threshold = int(dao.get_service_setting("BREAKER_FAILURES", 0) or 0)
+        if threshold <= 0:
+            return None
+        service = dao.service_name()
+        breaker = cls.breakers.get(service)
+        if breaker is None:
+            breaker = cls.breakers.setdefault(service, cls(
+                failure_threshold=threshold,
+                latency_threshold=dao.get_service_setting(
+                    "BREAKER_LATENCY", None),
+                reset_timeout=dao.get_service_setting(
+                    "BREAKER_RESET_TIMEOUT", 30)))
+        return breaker
+
+    def call(self, url, func, *args, **kwargs):
+        self._before(url)
+        start = self.clock()
+        try:
+            result = func(*args, **kwargs)
+        except DataFailureException as ex:
+            self._after(ex.status not in self.statuses)
+            raise
+        except Exception:
+            self._after(False)
+            raise
+        self._after(self.latency_threshold is None or (
+            self.clock() - start <= self.latency_threshold))
+        return result
+
+    def _before(self, url):
+        with self._lock:
+            if self.state == self.OPEN and (
+                    self.clock() - self._opened_at >= self.reset_timeout):
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+            if self.state != self.CLOSED:
+                self.rejected += 1
+                raise CircuitOpenError(url)
+
+    def _after(self, success):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial = False
+            if success:
+                if self.state == self.OPEN:
+                    # a call started before the breaker opened
+                    return
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                    self.failures >= self.failure_threshold):
+                if self.state != self.OPEN:
+                    self.opened += 1
+                    logger.warning("Circuit breaker open after %s failures",
+                                   self.failures)
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,232 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A local SQLite snapshot of the person directory, for serving lookups
+during hrp outages and under heavy read traffic.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from restclients_core.exceptions import DataFailureException
+from uw_hrp import HRP
+from uw_hrp.export import iter_position_rows, iter_records
+from uw_hrp.models import parse_date, validate_fields
+from uw_hrp.sync import latest_timestamp
+
+# The key types a person can be found by
+ID_KEY_TYPES = ("netid", "regid", "prior_regid", "employee_id")
+KEY_TYPES = ID_KEY_TYPES + ("supervisor_eid", "org_code")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS person (
+    id INTEGER PRIMARY KEY,
+    person_key TEXT UNIQUE NOT NULL,
+    data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS person_index (
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    person_id INTEGER NOT NULL,
+    PRIMARY KEY (type, value, person_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS person_index_person_id
+    ON person_index (person_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT);
+"""
+
+
+def get_index_keys(data):
+    """
+    Returns the set of (type, value) index keys of a raw person record
+    """
+    keys = set()
+    if data.get("RegID"):
+        keys.add(("regid", data["RegID"]))
+    if data.get("EmployeeID"):
+        keys.add(("employee_id", data["EmployeeID"]))
+    for id in data.get("IDs") or []:
+        if id.get("Value") and id.get("Type") == "NetID":
+            keys.add(("netid", id["Value"]))
+        if id.get("Value") and id.get("Type") == "PriorRegID":
+            keys.add(("prior_regid", id["Value"]))
+    for row in iter_position_rows([data]):
+        if row.supervisor_eid:
+            keys.add(("supervisor_eid", row.supervisor_eid))
+        if row.org_code:
+            keys.add(("org_code", row.org_code))
+    return set((type, value.lower()) for type, value in keys)
+
+
+class PersonSnapshot(object):
+    """
+    Raw person records in a SQLite database at path, indexed by netid,
+    regid, prior regid, employee_id, and by the supervisor_eid and
+    org_code of their active positions. Index lookups are not case
+    sensitive.
+    """
+    BATCH_SIZE = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self):
+        # sqlite connections can't be shared across threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @classmethod
+    def build(cls, path, hrp=None, **kwargs):
+        """
+        Streams a person search, taking the iter_person_records
+        parameters, into a new snapshot that then replaces the one at
+        path. Returns the new PersonSnapshot.
+        """
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        snapshot = cls(tmp_path)
+        snapshot.add_records(iter_records(hrp, **kwargs))
+        snapshot.close()
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def update(self, hrp=None, **kwargs):
+        """
+        Applies the records changed since the snapshot's watermark, the
+        latest RepositoryTimeStamp it holds. Returns the number of
+        records updated.
+        """
+        watermark = self.watermark
+        if watermark is None:
+            raise ValueError("No watermark to update the snapshot from")
+        kwargs["changed_since_date"] = (
+            parse_date(watermark).date().isoformat())
+        return self.add_records(iter_records(hrp, **kwargs))
+
+    @property
+    def watermark(self):
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def add_records(self, records):
+        """
+        Adds or replaces the raw person records, returning their count
+        """
+        count = 0
+        watermark = self.watermark
+        connection = self.connection
+        for data in records:
+            watermark = latest_timestamp(
+                watermark, data.get("RepositoryTimeStamp"))
+            self._add_record(connection, data)
+            count += 1
+            if count % self.BATCH_SIZE == 0:
+                self._set_watermark(connection, watermark)
+                connection.commit()
+        self._set_watermark(connection, watermark)
+        connection.commit()
+        return count
+
+    def _add_record(self, connection, data):
+        person_key = data.get("RegID") or data.get("EmployeeID")
+        row = connection.execute(
+            "SELECT id FROM person WHERE person_key = ?",
+            (person_key,)).fetchone()
+        if row is None:
+            person_id = connection.execute(
+                "INSERT INTO person (person_key, data) VALUES (?, ?)",
+                (person_key, json.dumps(data))).lastrowid
+        else:
+            person_id = row[0]
+            connection.execute(
+                "UPDATE person SET data = ? WHERE id = ?",
+                (json.dumps(data), person_id))
+            connection.execute(
+                "DELETE FROM person_index WHERE person_id = ?", (person_id,))
+        connection.executemany(
+            "INSERT INTO person_index (type, value, person_id) "
+            "VALUES (?, ?, ?)",
+            [(type, value, person_id)
+             for type, value in get_index_keys(data)])
+
+    def _set_watermark(self, connection, watermark):
+        if watermark is not None:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('watermark', ?)", (watermark,))
+
+    def get_record(self, id, key_types=ID_KEY_TYPES):
+        """
+        Returns the raw person record with the id as any of key_types,
+        or None
+        """
+        row = self.connection.execute(
+            "SELECT person.data FROM person_index JOIN person "
+            "ON person.id = person_index.person_id "
+            "WHERE person_index.type IN ({0}) AND person_index.value = ? "
+            "LIMIT 1".format(", ".join("?" * len(key_types))),
+            tuple(key_types) + (str(id).lower(),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_records(self, key_type, value):
+        """
+        Returns the raw person records indexed by the key_type value,
+        such as all those with an org_code
+        """
+        if key_type not in KEY_TYPES:
+            raise ValueError("Invalid key type: {0}".format(key_type))
+        return [json.loads(row[0]) for row in self.connection.execute(
+            "SELECT person.data FROM person_index JOIN person "
+            "ON person.id = person_index.person_id "
+            "WHERE person_index.type = ? AND person_index.value = ? "
+            "ORDER BY person.id", (key_type, str(value).lower()))]
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM person").fetchone()[0]
+
+
+class SnapshotHRP(HRP):
+    """
+    An HRP whose get_person_by_* and get_persons lookups are answered
+    from a snapshot (any object with get_record(id)). include_future and
+    use_cache are accepted for compatibility and ignored; searches still
+    go to the hrp web service.
+    """
+    def __init__(self, snapshot, **kwargs):
+        super(SnapshotHRP, self).__init__(**kwargs)
+        self.snapshot = snapshot
+
+    def _get_person(self, id, include_future, use_cache=True, fields=None):
+        validate_fields(fields)
+        data = self.snapshot.get_record(id)
+        if data is None:
+            raise DataFailureException(
+                self._person_url(id, include_future), 404,
+                "Not found in snapshot")
+        return self._person(data, fields)
+
+    def get_persons_by_supervisor(self, employee_id, fields=None):
+        return [self._person(data, fields) for data in
+                self.snapshot.find_records("supervisor_eid", employee_id)]
+
+    def get_persons_by_org_code(self, org_code, fields=None):
+        return [self._person(data, fields) for data in
+                self.snapshot.find_records("org_code", org_code)]
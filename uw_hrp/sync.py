@@ -0,0 +1,141 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Incremental sync of the person records changed since the last sync.
+"""
+
+import os
+from uw_hrp import HRP, get_next_href
+from uw_hrp.checkpoint import load_json_file, save_json_file
+from uw_hrp.models import parse_date
+
+
+class SyncState(object):
+    """
+    Stores the sync watermark and the progress of an unfinished sync as
+    json in path. The keys of the records already yielded by an
+    unfinished sync are appended, a page at a time, to path + ".seen".
+    """
+    def __init__(self, path):
+        self.path = path
+        self.seen_path = path + ".seen"
+
+    def load(self):
+        return load_json_file(self.path, {})
+
+    def save(self, state):
+        save_json_file(self.path, state)
+
+    def load_seen(self):
+        seen = {}
+        try:
+            with open(self.seen_path) as f:
+                for line in f:
+                    key, timestamp = line.rstrip("\n").split(" ", 1)
+                    seen[key] = timestamp
+        except FileNotFoundError:
+            pass
+        return seen
+
+    def add_seen(self, seen):
+        with open(self.seen_path, "a") as f:
+            for key, timestamp in seen.items():
+                f.write("{0} {1}\n".format(key, timestamp))
+
+    def clear_seen(self):
+        try:
+            os.remove(self.seen_path)
+        except FileNotFoundError:
+            pass
+
+
+class PersonSync(object):
+    """
+    Streams the Person records changed since the last successful sync,
+    using person_search(changed_since_date=...).
+
+    The watermark is the latest RepositoryTimeStamp of the records
+    synced. As changed_since_date takes a date, the next sync searches
+    from the watermark's date and skips the records with a
+    RepositoryTimeStamp at or before the watermark. An
+    interrupted sync resumes from the page after the last
+    completed page, and a record that appears on more than one page is
+    only yielded again if its RepositoryTimeStamp has changed.
+    """
+    def __init__(self, state_path, since=None, hrp=None, **kwargs):
+        """
+        since: the changed_since_date of the first sync
+        kwargs: other person_search parameters
+        """
+        self.state = SyncState(state_path)
+        self.since = since
+        self.hrp = hrp if hrp is not None else HRP()
+        self.search_params = kwargs
+
+    @property
+    def watermark(self):
+        return self.state.load().get("watermark")
+
+    def changes(self):
+        """
+        Yields the changed Person objects. A page is recorded as
+        completed once all of its records have been consumed, and the
+        watermark is saved once the last page is completed.
+        """
+        state = self.state.load()
+        url = state.get("next_url")
+        if url is None:
+            url = self._start_url(state.get("watermark"))
+            state["sync_watermark"] = state.get("watermark")
+            self.state.clear_seen()
+        seen = self.state.load_seen()
+        watermark = state.get("watermark")
+        if watermark is not None:
+            watermark = parse_date(watermark)
+
+        for data, persons in self.hrp._iter_search_pages(url):
+            page_seen = {}
+            for record in data.get("Persons") or []:
+                key = record.get("RegID") or record.get("EmployeeID")
+                timestamp = record.get("RepositoryTimeStamp") or ""
+                if seen.get(key) == timestamp:
+                    continue
+                if (watermark is not None and timestamp and
+                        parse_date(timestamp) <= watermark):
+                    continue
+                seen[key] = page_seen[key] = timestamp
+                state["sync_watermark"] = latest_timestamp(
+                    state.get("sync_watermark"), timestamp)
+                yield self.hrp._person(record)
+
+            self.state.add_seen(page_seen)
+            state["next_url"] = get_next_href(data)
+            if state["next_url"] is not None:
+                self.state.save(state)
+
+        self.state.save({"watermark": state.get("sync_watermark")})
+        self.state.clear_seen()
+
+    def _start_url(self, watermark):
+        if watermark is not None:
+            since = parse_date(watermark).date().isoformat()
+        elif self.since is not None:
+            since = self.since
+        else:
+            raise ValueError("No watermark or since date to sync from")
+
+        params = dict(self.search_params)
+        params["changed_since_date"] = since
+        return self.hrp._search_url(params)
+
+
+def latest_timestamp(timestamp1, timestamp2):
+    if not timestamp1:
+        return timestamp2 or None
+    if not timestamp2:
+        return timestamp1
+    if parse_date(timestamp2) > parse_date(timestamp1):
+        return timestamp2
+    return timestamp1
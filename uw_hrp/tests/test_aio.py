@@ -0,0 +1,92 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import asyncio
+from unittest import TestCase
+from restclients_core.exceptions import (
+    DataFailureException, InvalidEmployeeID, InvalidRegID, InvalidNetID)
+from uw_hrp.aio import AsyncHRP
+from uw_hrp.util import fdao_hrp_override
+
+
+@fdao_hrp_override
+class AsyncHrpTest(TestCase):
+
+    def test_get_person(self):
+        async def lookups():
+            async with AsyncHRP() as hrp:
+                return await asyncio.gather(
+                    hrp.get_person_by_netid("faculty"),
+                    hrp.get_person_by_netid("faculty", include_future=True),
+                    hrp.get_person_by_employee_id("000000005"),
+                    hrp.get_person_by_regid(
+                        "9136CCB8F66711D5BE060004AC494FFE"))
+
+        persons = asyncio.run(lookups())
+        self.assertEqual(len(persons), 4)
+        self.assertEqual(persons[0].employee_id, "000000005")
+        self.assertEqual(persons[1].employee_id, "000000005")
+        self.assertEqual(persons[2].netid, "bill")
+        self.assertEqual(persons[3].netid, "javerage")
+        self.assertEqual(persons[0].to_json(), persons[2].to_json())
+
+    def test_shared_lookups(self):
+        async def lookups():
+            async with AsyncHRP(max_workers=1) as hrp:
+                get_person = hrp.hrp.get_person_by_netid
+                calls = []
+
+                def get_person_by_netid(*args):
+                    calls.append(args)
+                    return get_person(*args)
+
+                hrp.hrp.get_person_by_netid = get_person_by_netid
+                persons = await asyncio.gather(*[
+                    hrp.get_person_by_netid("faculty") for i in range(50)])
+                return persons, calls, hrp._pending
+
+        persons, calls, pending = asyncio.run(lookups())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(person is persons[0] for person in persons))
+        self.assertEqual(pending, {})
+
+    def test_errors(self):
+        async def lookup(method, id):
+            async with AsyncHRP(max_workers=1) as hrp:
+                return await getattr(hrp, method)(id)
+
+        self.assertRaises(InvalidNetID, asyncio.run,
+                          lookup("get_person_by_netid", ""))
+        self.assertRaises(InvalidRegID, asyncio.run,
+                          lookup("get_person_by_regid", "000"))
+        self.assertRaises(InvalidEmployeeID, asyncio.run,
+                          lookup("get_person_by_employee_id", ""))
+        self.assertRaises(DataFailureException, asyncio.run,
+                          lookup("get_person_by_netid", "None"))
+
+    def test_person_search(self):
+        async def search(limit=None, **kwargs):
+            persons = []
+            async with AsyncHRP() as hrp:
+                async for person in hrp.person_search(**kwargs):
+                    persons.append(person)
+                    if len(persons) == limit:
+                        break
+            return persons
+
+        persons = asyncio.run(search(current_faculty="true", page_size=1))
+        self.assertEqual([p.employee_id for p in persons],
+                         ["000000005", "123456789", "100000001"])
+
+        persons = asyncio.run(
+            search(current_faculty="true", page_size=1, fields=[]))
+        self.assertEqual([len(p.worker_details) for p in persons], [0, 0, 0])
+
+        persons = asyncio.run(
+            search(limit=1, current_faculty="true", page_size=1))
+        self.assertEqual(len(persons), 1)
+
+        persons = asyncio.run(search(changed_since_date="2022-12-12"))
+        self.assertEqual(len(persons), 1)
+        self.assertFalse(persons[0].is_active)
@@ -0,0 +1,435 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+from commonconf import override_settings
+from restclients_core.dao import MockDAO
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from uw_hrp import HRP, get_response_header, to_http_date
+from uw_hrp.cache import CachedPerson, LRUCache, BackendCache, SingleFlight
+from uw_hrp.util import fdao_hrp_override
+
+
+class ConditionalDAO(MockDAO):
+    """
+    Serves the mock resources with an ETag, responding 304 to a request
+    with a matching If-None-Match
+    """
+    etag = '"v1"'
+    requests = []
+
+    def load(self, method, url, headers, body):
+        ConditionalDAO.requests.append(dict(headers))
+        if headers.get("If-None-Match") == ConditionalDAO.etag:
+            response = MockHTTP()
+            response.status = 304
+            return response
+        response = super(ConditionalDAO, self).load(
+            method, url, headers, body)
+        response.headers = dict(response.headers or {})
+        response.headers["ETag"] = ConditionalDAO.etag
+        return response
+
+
+class DictBackend(object):
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class PickleBackend(DictBackend):
+    # stores pickled values, as memcached and redis backends do
+    def get(self, key):
+        value = self.data.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, timeout):
+        self.data[key] = pickle.dumps(value)
+
+
+class LRUCacheTest(TestCase):
+
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)  # evicts b, the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats(), {
+            "hits": 2, "misses": 2, "stale_hits": 0, "evictions": 1,
+            "size": 2})
+
+        cache.delete("a")
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=10)
+        with patch("uw_hrp.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("uw_hrp.cache.time.monotonic", return_value=109):
+            self.assertEqual(cache.get("a"), 1)
+        with patch("uw_hrp.cache.time.monotonic", return_value=110):
+            self.assertIsNone(cache.get("a"))
+            # kept until evicted, for its validators
+            self.assertEqual(cache.get_expired("a"), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get_expired("b"))
+
+    def test_stale(self):
+        cache = LRUCache(ttl=10, stale_ttl=20)
+        with patch("uw_hrp.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+            self.assertEqual(cache.get_stale("a"), 1)
+        with patch("uw_hrp.cache.time.monotonic", return_value=110):
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get_stale("a"), 1)
+        with patch("uw_hrp.cache.time.monotonic", return_value=129):
+            self.assertEqual(cache.get_stale("a"), 1)
+        with patch("uw_hrp.cache.time.monotonic", return_value=130):
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNone(cache.get_stale("a"))
+            self.assertEqual(cache.get_expired("a"), 1)
+        self.assertEqual(cache.stats()["stale_hits"], 2)
+
+    def test_aliases(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set_alias("x", "a")  # no entry a to refer to
+        self.assertIsNone(cache.get("x"))
+        cache.set("a", 1)
+        cache.set_alias("x", "a")
+        cache.set_alias("y", "a")
+        self.assertEqual(cache.get("x"), 1)
+        self.assertEqual(cache.get_stale("y"), 1)
+        self.assertEqual(cache.stats(), {
+            "hits": 1, "misses": 1, "stale_hits": 0, "evictions": 0,
+            "size": 1})
+
+        cache.set("y", 2)  # an entry replaces an alias
+        self.assertEqual(cache.get("y"), 2)
+        self.assertEqual(len(cache), 2)
+        cache.set("b", 3)  # evicts a, and its alias x
+        self.assertIsNone(cache.get("x"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.set("a", 5)
+        self.assertIsNone(cache.get("x"))
+        cache.set_alias("x", "a")
+        cache.delete("a")
+        self.assertIsNone(cache.get("x"))
+        self.assertEqual(cache._aliases, {})
+
+
+class BackendCacheTest(TestCase):
+
+    def test_get_set(self):
+        backend = DictBackend()
+        cache = BackendCache(backend, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(backend.data, {"uw_hrp:a": 1})
+        self.assertEqual(cache.get("a"), 1)
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {
+            "hits": 1, "misses": 2})
+
+    def test_aliases(self):
+        backend = DictBackend()
+        cache = BackendCache(backend, ttl=60)
+        cache.set("a", 1)
+        cache.set_alias("x", "a")
+        self.assertEqual(backend.data, {"uw_hrp:a": 1, "uw_hrp:x": "a"})
+        self.assertEqual(cache.get("x"), 1)
+        cache.delete("a")
+        self.assertIsNone(cache.get("x"))
+        self.assertEqual(cache.stats(), {
+            "hits": 1, "misses": 1})
+
+
+def wait_for_followers(flight, count):
+    # holds the leader's call until count callers are waiting on it
+    while flight.shared < count:
+        time.sleep(0.001)
+
+
+class SingleFlightTest(TestCase):
+
+    def test_do(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch(value):
+            calls.append(value)
+            wait_for_followers(flight, 3)
+            return [value]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "key", fetch, i)
+                       for i in range(4)]
+            results = [future.result() for future in futures]
+        self.assertEqual(len(calls), 1)
+        for result in results:
+            self.assertIs(result, results[0])
+        self.assertEqual(flight.stats(), {"calls": 1, "shared": 3})
+
+        # once complete, the next call runs again
+        self.assertEqual(flight.do("key", lambda: "again"), "again")
+        self.assertEqual(flight.stats(), {"calls": 2, "shared": 3})
+
+    def test_do_exception(self):
+        flight = SingleFlight()
+
+        def fetch():
+            wait_for_followers(flight, 2)
+            raise DataFailureException("/url", 503, "")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, "key", fetch)
+                       for i in range(3)]
+            errors = [future.exception() for future in futures]
+        self.assertEqual(errors[0].status, 503)
+        for error in errors:
+            self.assertIs(error, errors[0])
+
+
+@fdao_hrp_override
+class HRPCacheTest(TestCase):
+
+    def test_cached_person(self):
+        cache = LRUCache()
+        hrp = HRP(cache=cache)
+        with patch.object(hrp, "get_response",
+                          wraps=hrp.get_response) as get_response:
+            person = hrp.get_person_by_netid("faculty")
+            self.assertIs(hrp.get_person_by_netid("faculty"), person)
+            self.assertEqual(get_response.call_count, 1)
+
+            future = hrp.get_person_by_netid("faculty", include_future=True)
+            self.assertIsNot(future, person)
+            self.assertEqual(get_response.call_count, 2)
+            self.assertIsNotNone(
+                cache.get("/hrp/v3/person/faculty.json?future_worker=true"))
+
+            fresh = hrp.get_person_by_netid("faculty", use_cache=False)
+            self.assertIsNot(fresh, person)
+            self.assertEqual(get_response.call_count, 3)
+            self.assertIs(hrp.get_person_by_netid("faculty"), fresh)
+
+        self.assertEqual(cache.stats()["hits"], 3)
+
+    def test_backend_cache(self):
+        cache = BackendCache(DictBackend())
+        hrp = HRP(cache=cache)
+        person = hrp.get_person_by_employee_id("000000005")
+        self.assertIs(hrp.get_person_by_employee_id("000000005"), person)
+        self.assertEqual(cache.stats(), {
+            "hits": 1, "misses": 1})
+
+        # a lookup bypassing the cache is not counted
+        fresh = hrp.get_person_by_employee_id("000000005", use_cache=False)
+        self.assertIsNot(fresh, person)
+        self.assertIs(hrp.get_person_by_employee_id("000000005"), fresh)
+        self.assertEqual(cache.stats(), {
+            "hits": 2, "misses": 1})
+
+    def test_pickled_backend_cache(self):
+        cache = BackendCache(PickleBackend())
+        hrp = HRP(cache=cache)
+        with patch.object(hrp, "get_response",
+                          wraps=hrp.get_response) as get_response:
+            person = hrp.get_person_by_netid("faculty")
+            cached = hrp.get_person_by_netid("faculty")
+            self.assertIsNot(cached, person)
+            self.assertEqual(cached.to_json(), person.to_json())
+            self.assertEqual(hrp.get_person_by_employee_id(
+                "000000005").to_json(), person.to_json())
+            self.assertEqual(get_response.call_count, 1)
+
+        lazy = HRP(cache=BackendCache(PickleBackend()), lazy=True)
+        person = lazy.get_person_by_netid("faculty")
+        self.assertEqual(lazy.get_person_by_netid("faculty").to_json(),
+                         person.to_json())
+
+    def test_cached_person_aliases(self):
+        cache = LRUCache()
+        hrp = HRP(cache=cache)
+        with patch.object(hrp, "get_response",
+                          wraps=hrp.get_response) as get_response:
+            person = hrp.get_person_by_netid("faculty")
+            self.assertIs(hrp.get_person_by_netid("bill"), person)
+            self.assertIs(hrp.get_person_by_employee_id("000000005"), person)
+            self.assertIs(hrp.get_person_by_regid(
+                "10000000000000000000000000000005"), person)
+            self.assertIs(hrp.get_person_by_regid(
+                "10000000000000000000000000000002"), person)
+            self.assertEqual(get_response.call_count, 1)
+
+            # aliases are kept per include_future
+            future = hrp.get_person_by_netid("faculty", include_future=True)
+            self.assertIsNot(future, person)
+            self.assertIs(hrp.get_person_by_employee_id(
+                "000000005", include_future=True), future)
+            self.assertEqual(get_response.call_count, 2)
+
+        # aliases are neither counted in the size nor as extra hits
+        self.assertEqual(cache.stats(), {
+            "hits": 5, "misses": 2, "stale_hits": 0, "evictions": 0,
+            "size": 2})
+        self.assertIs(cache.get("/hrp/v3/person/000000005.json").person,
+                      person)
+        # there is no lookup by student_id
+        self.assertNotIn("/hrp/v3/person/{0}.json".format(person.student_id),
+                         cache._aliases)
+
+        # an alias to an evicted entry is a miss
+        cache.delete("/hrp/v3/person/faculty.json")
+        person = hrp.get_person_by_employee_id("000000005")
+        self.assertIs(
+            cache.get("/hrp/v3/person/000000005.json").person, person)
+
+    def test_single_flight(self):
+        hrp = HRP(cache=LRUCache())
+        flight = SingleFlight()
+        get_response = hrp.get_response
+
+        def slow_get_response(url, headers=None):
+            wait_for_followers(flight, 3)
+            return get_response(url, headers)
+
+        with patch.object(hrp, "_inflight", flight), patch.object(
+                hrp, "get_response", side_effect=slow_get_response) as mock:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(
+                    hrp.get_person_by_netid, "faculty", use_cache=False)
+                    for i in range(4)]
+                results = [future.result() for future in futures]
+        self.assertEqual(mock.call_count, 1)
+        for person in results:
+            self.assertIs(person, results[0])
+        self.assertIs(hrp.cache.get("/hrp/v3/person/faculty.json").person,
+                      results[0])
+
+    def test_single_flight_per_dao(self):
+        hrp = HRP()
+        self.assertIs(HRP()._inflight, hrp._inflight)
+        with override_settings(RESTCLIENTS_HRPWS_DAO_CLASS=(
+                "uw_hrp.tests.test_cache.ConditionalDAO")):
+            self.assertIsNot(HRP()._inflight, hrp._inflight)
+
+
+@override_settings(
+    RESTCLIENTS_HRPWS_DAO_CLASS="uw_hrp.tests.test_cache.ConditionalDAO")
+class ConditionalRequestTest(TestCase):
+
+    def setUp(self):
+        ConditionalDAO.etag = '"v1"'
+        ConditionalDAO.requests = []
+
+    def test_validators(self):
+        self.assertEqual(to_http_date("2022-11-29T10:56:28.477-08:00"),
+                         "Tue, 29 Nov 2022 18:56:28 GMT")
+        self.assertEqual(to_http_date("2022-11-29T10:56:28"),
+                         "Tue, 29 Nov 2022 10:56:28 GMT")
+        self.assertIsNone(to_http_date(None))
+
+        response = MockHTTP()
+        response.headers = {"etag": '"a"'}
+        self.assertEqual(get_response_header(response, "ETag"), '"a"')
+        self.assertIsNone(get_response_header(response, "Last-Modified"))
+        self.assertIsNone(get_response_header(MockHTTP(), "ETag"))
+
+        self.assertEqual(CachedPerson(None, '"a"', None).conditional_headers(),
+                         {"If-None-Match": '"a"'})
+        self.assertEqual(CachedPerson(None, None, None).conditional_headers(),
+                         {})
+
+    def test_not_modified(self):
+        cache = LRUCache()
+        hrp = HRP(cache=cache)
+        person = hrp.get_person_by_netid("faculty")
+        entry = cache.get("/hrp/v3/person/faculty.json")
+        self.assertEqual(entry, (person, '"v1"',
+                                 "Tue, 29 Nov 2022 18:56:28 GMT"))
+        self.assertNotIn("If-None-Match", ConditionalDAO.requests[0])
+
+        # a refresh sends the validators, and reuses the cached person
+        self.assertIs(hrp.get_person_by_netid("faculty", use_cache=False),
+                      person)
+        self.assertEqual(ConditionalDAO.requests[1]["If-None-Match"], '"v1"')
+        self.assertEqual(ConditionalDAO.requests[1]["If-Modified-Since"],
+                         "Tue, 29 Nov 2022 18:56:28 GMT")
+
+        ConditionalDAO.etag = '"v2"'
+        fresh = hrp.get_person_by_netid("faculty", use_cache=False)
+        self.assertIsNot(fresh, person)
+        self.assertEqual(fresh.employee_id, "000000005")
+        self.assertIs(hrp.get_person_by_netid("faculty"), fresh)
+        self.assertEqual(
+            cache.get("/hrp/v3/person/faculty.json").etag, '"v2"')
+
+        # a projected person is never a conditional request
+        hrp.get_person_by_netid("faculty", use_cache=False, fields=[])
+        self.assertNotIn("If-None-Match", ConditionalDAO.requests[-1])
+        self.assertEqual(len(ConditionalDAO.requests), 4)
+
+        # without a cache, no conditional requests are made
+        HRP().get_person_by_netid("faculty")
+        self.assertNotIn("If-None-Match", ConditionalDAO.requests[-1])
+
+    def test_stale_not_modified(self):
+        cache = LRUCache(ttl=10, stale_ttl=60)
+        hrp = HRP(cache=cache)
+        with patch("uw_hrp.cache.time.monotonic", return_value=100):
+            person = hrp.get_person_by_netid("faculty")
+        with patch("uw_hrp.cache.time.monotonic", return_value=115):
+            future = hrp._refresh_person(
+                "/hrp/v3/person/faculty.json", False,
+                cache.get_stale("/hrp/v3/person/faculty.json"))
+            self.assertIs(future.result(), person)
+            self.assertIs(hrp.get_person_by_netid("faculty"), person)
+        self.assertEqual(ConditionalDAO.requests[1]["If-None-Match"], '"v1"')
+        self.assertEqual(len(ConditionalDAO.requests), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_expired_not_modified(self):
+        cache = LRUCache(ttl=10)
+        hrp = HRP(cache=cache)
+        with patch("uw_hrp.cache.time.monotonic", return_value=100):
+            person = hrp.get_person_by_netid("faculty")
+        # a lookup after the ttl revalidates the expired entry
+        with patch("uw_hrp.cache.time.monotonic", return_value=115):
+            self.assertIs(hrp.get_person_by_netid("faculty"), person)
+            self.assertIs(hrp.get_person_by_employee_id("000000005"),
+                          person)
+        self.assertEqual(
+            ["If-None-Match" in headers
+             for headers in ConditionalDAO.requests], [False, True])
+
+        ConditionalDAO.etag = '"v2"'
+        with patch("uw_hrp.cache.time.monotonic", return_value=130):
+            fresh = hrp.get_person_by_netid("faculty")
+        self.assertIsNot(fresh, person)
+        self.assertEqual(ConditionalDAO.requests[2]["If-None-Match"], '"v1"')
+        self.assertEqual(
+            cache.get_expired("/hrp/v3/person/faculty.json").etag, '"v2"')
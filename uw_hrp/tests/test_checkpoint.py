@@ -0,0 +1,72 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_hrp import HRP
+from uw_hrp.checkpoint import (
+    JSONFileCheckpointStore, load_json_file, save_json_file)
+from uw_hrp.util import fdao_hrp_override
+
+SEARCH_URL = "/hrp/v3/person.json?current_faculty=true&page_size=1"
+
+
+@fdao_hrp_override
+class CheckpointTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "checkpoints.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_json_file(self):
+        self.assertIsNone(load_json_file(self.path))
+        self.assertEqual(load_json_file(self.path, {}), {})
+        save_json_file(self.path, {"a": 1})
+        self.assertEqual(load_json_file(self.path), {"a": 1})
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_store(self):
+        store = JSONFileCheckpointStore(self.path)
+        self.assertIsNone(store.load("a"))
+        store.delete("a")
+        self.assertFalse(os.path.exists(self.path))
+        store.save("a", {"count": 1})
+        store.save("b", {"count": 2})
+        self.assertEqual(store.load("a"), {"count": 1})
+        store.delete("a")
+        self.assertIsNone(store.load("a"))
+        self.assertEqual(JSONFileCheckpointStore(self.path).load("b"),
+                         {"count": 2})
+
+    def test_resume_search(self):
+        hrp = HRP()
+        persons = hrp.iter_person_search(
+            checkpoint=self.path, current_faculty="true", page_size=1)
+        self.assertEqual(next(persons).employee_id, "000000005")
+        self.assertEqual(next(persons).employee_id, "123456789")
+        persons.close()  # interrupted on page 2
+
+        store = JSONFileCheckpointStore(self.path)
+        self.assertEqual(store.load(SEARCH_URL), {
+            "next_url": SEARCH_URL + "&page_start=2", "count": 1})
+
+        persons = list(hrp.iter_person_search(
+            checkpoint=store, current_faculty="true", page_size=1))
+        self.assertEqual([p.employee_id for p in persons],
+                         ["123456789", "100000001"])
+        self.assertIsNone(store.load(SEARCH_URL))
+
+    def test_failed_search(self):
+        store = JSONFileCheckpointStore(self.path)
+        store.save(SEARCH_URL, {"next_url": SEARCH_URL + "&page_start=4",
+                                "count": 3})
+        persons = HRP().iter_person_search(
+            checkpoint=store, current_faculty="true", page_size=1)
+        self.assertRaises(DataFailureException, list, persons)
+        self.assertEqual(store.load(SEARCH_URL)["count"], 3)
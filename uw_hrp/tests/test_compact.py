@@ -0,0 +1,67 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+from os.path import dirname
+from unittest import TestCase
+import json
+import os
+from uw_hrp.compact import (
+    CompactPerson, CompactWorkerDetails, CompactEmploymentDetails,
+    CompactEmploymentStatus, CompactJobProfile)
+from uw_hrp.models import (
+    Person, WorkerDetails, EmploymentDetails, EmploymentStatus, JobProfile)
+
+
+def load_records():
+    path = os.path.join(dirname(__file__), "..", "resources", "hrpws",
+                        "file", "hrp", "v3")
+    records = []
+    for name in ["faculty.json", "9136CCB8F66711D5BE060004AC494FFE.json"]:
+        with open(os.path.join(path, "person", name)) as f:
+            records.append(json.load(f))
+    with open(os.path.join(
+            path, "person.json_changed_since_date_2022-12-12_"
+            "page_size_200")) as f:
+        records.extend(json.load(f)["Persons"])
+    return records
+
+
+class CompactTest(TestCase):
+
+    def test_person(self):
+        for data in load_records():
+            person = Person(data=data)
+            compact = CompactPerson.from_data(data)
+            self.assertEqual(compact.to_json(), person.to_json())
+            for attr in ["netid", "regid", "employee_id", "student_id",
+                         "is_active", "primary_manager_id"]:
+                self.assertEqual(getattr(compact, attr),
+                                 getattr(person, attr))
+            self.assertEqual(list(compact.prior_regids), person.prior_regids)
+            self.assertEqual(compact.identifiers(), person.identifiers())
+            for worker, compact_worker in zip(person.worker_details,
+                                              compact.worker_details):
+                self.assertEqual(compact_worker.primary_job_title,
+                                 worker.primary_job_title)
+
+    def test_empty_data(self):
+        self.assertEqual(CompactJobProfile.from_data(None).to_json(),
+                         JobProfile(data=None).to_json())
+        self.assertEqual(CompactEmploymentStatus.from_data(None).to_json(),
+                         EmploymentStatus(data=None).to_json())
+        data = {"WID": "abc", "EmploymentStatus": {"Active": False},
+                "EmploymentDetails": [{"PrimaryPosition": True}]}
+        self.assertEqual(CompactWorkerDetails.from_data(data).to_json(),
+                         WorkerDetails(data=data).to_json())
+        self.assertEqual(
+            CompactEmploymentDetails.from_data({}).to_json(),
+            EmploymentDetails(data={}).to_json())
+
+    def test_immutable(self):
+        person = CompactPerson.from_data(load_records()[0])
+        self.assertFalse(hasattr(person, "__dict__"))
+        self.assertRaises(AttributeError, setattr, person, "netid", "x")
+        position = person.worker_details[0].primary_position
+        self.assertRaises(AttributeError, setattr, position, "org_code", "x")
+        self.assertIsInstance(person.worker_details, tuple)
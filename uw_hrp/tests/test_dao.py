@@ -2,9 +2,17 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import TestCase
+from commonconf import override_settings
+from uw_hrp import HRP
 from uw_hrp.dao import HRP_DAO
 
+RESOURCE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "resources", "hrpws", "file")
+
 
 class DaoTest(TestCase):
 
@@ -13,3 +21,95 @@ class DaoTest(TestCase):
         self.assertEqual(dao.service_name(), "hrpws")
         self.assertTrue(len(dao.service_mock_paths()) > 0)
         self.assertTrue(dao.is_using_file_dao())
+        self.assertIsNone(dao.pool_stats())
+        self.assertTrue(dao.get_service_setting("POOL_BLOCK"))
+        self.assertTrue(dao.get_service_setting("KEEPALIVE"))
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    # serves the mock resources over HTTP/1.1 keep-alive connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.replace("?", "_").replace("&", "_").replace(
+            "=", "_")
+        try:
+            with open(RESOURCE_DIR + path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+        except IOError:
+            body = b"Not Found"
+            self.send_response(404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LiveDaoTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        HRP_DAO().close_pool()
+
+    def tearDown(self):
+        HRP_DAO().close_pool()
+
+    def live_settings(self, **kwargs):
+        return override_settings(
+            RESTCLIENTS_HRPWS_DAO_CLASS="Live",
+            RESTCLIENTS_HRPWS_HOST="http://127.0.0.1:{0}".format(
+                self.server.server_address[1]),
+            **kwargs)
+
+    def test_pool_reuse(self):
+        with self.live_settings(RESTCLIENTS_HRPWS_POOL_SIZE=2):
+            hrp = HRP()
+            for i in range(3):
+                person = hrp.get_person_by_netid("faculty", use_cache=False)
+                self.assertEqual(person.employee_id, "000000005")
+            persons = hrp.person_search(current_faculty="true", page_size=1)
+            self.assertEqual(len(persons), 3)
+
+            stats = hrp.DAO.pool_stats()
+            self.assertEqual(stats["requests"], 6)
+            self.assertEqual(stats["connections"], 1)
+            self.assertEqual(stats["reused"], 5)
+            self.assertEqual(stats["maxsize"], 2)
+            pool = hrp.DAO.get_implementation().get_pool()
+            self.assertTrue(pool.block)
+            self.assertIn("socket_options", pool.conn_kw)
+
+    def test_pool_concurrent(self):
+        with self.live_settings(RESTCLIENTS_HRPWS_POOL_SIZE=2,
+                                RESTCLIENTS_HRPWS_KEEPALIVE=False):
+            hrp = HRP()
+            ids = ["faculty", "none1", "none2", "none3"]
+            for i in range(2):
+                results = hrp.get_persons(ids, max_workers=4)
+                self.assertEqual(results["faculty"].employee_id, "000000005")
+                self.assertEqual(results["none1"].status, 404)
+            stats = hrp.DAO.pool_stats()
+            self.assertEqual(stats["requests"], 8)
+            self.assertLessEqual(stats["connections"], 2)
+            self.assertGreaterEqual(stats["reused"], 6)
+            pool = hrp.DAO.get_implementation().get_pool()
+            self.assertNotIn("socket_options", pool.conn_kw)
+
+        with self.live_settings(RESTCLIENTS_HRPWS_POOL_BLOCK="false"):
+            HRP_DAO().close_pool()
+            pool = HRP_DAO().get_implementation().get_pool()
+            self.assertFalse(pool.block)
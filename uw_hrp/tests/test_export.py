@@ -0,0 +1,112 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+from io import StringIO
+from unittest import TestCase, skipUnless
+import csv
+import json
+from uw_hrp import HRP
+from uw_hrp.export import (
+    POSITION_COLUMNS, iter_position_rows, write_csv, write_jsonl,
+    to_columns, export_positions)
+from uw_hrp.models import Person
+from uw_hrp.util import fdao_hrp_override
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+FACULTY_ROW = ("000000005", "bill", "SOM",
+               "Family Medicine: King Pierce JM Academic", "21184",
+               "Academic Personnel", "Unpaid Academic",
+               "2012-07-01 00:00:00-07:00", "845007271", True)
+
+
+def person_rows(person):
+    # the rows built from the Person model
+    for worker in person.worker_details:
+        positions = [worker.primary_position] + worker.other_active_positions
+        for pos in positions:
+            if pos is not None:
+                data = pos.to_json()
+                yield (person.employee_id, person.netid, data["org_code"],
+                       data["org_name"], data["job_profile"]["job_code"],
+                       data["job_class"], data["pos_type"],
+                       data["start_date"], data["supervisor_eid"],
+                       data["is_primary"])
+
+
+@fdao_hrp_override
+class ExportTest(TestCase):
+
+    def setUp(self):
+        self.records = list(HRP().iter_person_records(
+            current_faculty="true", page_size=1))
+
+    def test_iter_position_rows(self):
+        rows = list(iter_position_rows(self.records))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], FACULTY_ROW)
+        self.assertEqual(rows[0].org_code, "SOM")
+        self.assertEqual(rows[0].supervisor_eid, "845007271")
+        expected = []
+        for data in self.records:
+            expected.extend(person_rows(Person(data=data)))
+        self.assertEqual(sorted(rows, key=str), sorted(expected, key=str))
+
+    def test_write_csv(self):
+        out = StringIO()
+        count = write_csv(iter_position_rows(self.records), out)
+        self.assertEqual(count, 3)
+        lines = list(csv.reader(StringIO(out.getvalue())))
+        self.assertEqual(tuple(lines[0]), POSITION_COLUMNS)
+        self.assertEqual(lines[1][:3], ["000000005", "bill", "SOM"])
+        self.assertEqual(len(lines), 4)
+
+    def test_write_jsonl(self):
+        out = StringIO()
+        count = write_jsonl(iter_position_rows(self.records), out)
+        self.assertEqual(count, 3)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(json.loads(lines[0]),
+                         dict(zip(POSITION_COLUMNS, FACULTY_ROW)))
+
+    def test_to_columns(self):
+        columns = to_columns(iter_position_rows(self.records))
+        self.assertEqual(tuple(columns.keys()), POSITION_COLUMNS)
+        self.assertEqual(columns["employee_id"],
+                         ["000000005", "123456789", "123456789"])
+        self.assertRaises(ValueError, to_columns, [], format="xls")
+
+    @skipUnless(numpy, "numpy is not installed")
+    def test_to_columns_numpy(self):
+        columns = to_columns(iter_position_rows(self.records),
+                             format="numpy")
+        self.assertEqual(columns["employee_id"].shape, (3,))
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_to_columns_arrow(self):
+        table = to_columns(iter_position_rows(self.records), format="arrow")
+        self.assertEqual(tuple(table.column_names), POSITION_COLUMNS)
+        self.assertEqual(table.num_rows, 3)
+        for name in POSITION_COLUMNS[:-1]:
+            self.assertEqual(table.schema.field(name).type, pyarrow.string())
+        self.assertEqual(table.schema.field("is_primary").type,
+                         pyarrow.bool_())
+        self.assertEqual(table.column("supervisor_eid").to_pylist(),
+                         ["845007271", "100000001", None])
+
+    def test_export_positions(self):
+        out = StringIO()
+        self.assertEqual(export_positions(
+            HRP(), out, format="jsonl", current_faculty="true",
+            page_size=1), 3)
+        self.assertRaises(ValueError, export_positions, HRP(), out,
+                          format="xls")
@@ -3,9 +3,16 @@
 
 
 from unittest import TestCase
+from unittest.mock import patch
+from commonconf import override_settings
 from restclients_core.exceptions import (
     DataFailureException, InvalidEmployeeID, InvalidRegID, InvalidNetID)
-from uw_hrp import HRP, convert_bytes_str
+from types import GeneratorType
+from uw_hrp import (
+    HRP, convert_bytes_str, format_log_data, get_next_href, get_page_size,
+    get_page_start, get_page_href)
+from uw_hrp.cache import LRUCache
+from uw_hrp.models import WORKER_FIELDS
 from uw_hrp.util import fdao_hrp_override
 
 
@@ -18,6 +25,31 @@ class HrpTest(TestCase):
         self.assertEqual(convert_bytes_str(b'bytes'), "bytes")
         self.assertEqual(convert_bytes_str('bytes'), "bytes")
 
+    def test_format_log_data(self):
+        self.assertEqual(format_log_data("abcdef"), "abcdef")
+        self.assertEqual(format_log_data("abcdef", 6), "abcdef")
+        self.assertEqual(format_log_data("abcdef", 3), "abc...(6 chars)")
+        self.assertEqual(format_log_data("abcdef", "3"), "abc...(6 chars)")
+        self.assertEqual(format_log_data("abcdef", 0), "(6 chars)")
+        self.assertEqual(format_log_data("", 0), "")
+
+    def test_get_resource_logging(self):
+        hrp = HRP()
+        url = "/hrp/v3/person/faculty.json"
+        with self.assertLogs("uw_hrp", level="DEBUG") as cm:
+            data = hrp.get_resource(url)
+        self.assertEqual(cm.output, [
+            "DEBUG:uw_hrp:{0} ==status==> 200".format(url),
+            "DEBUG:uw_hrp:{0} ==data==> {1}".format(url, data)])
+
+        with override_settings(RESTCLIENTS_HRPWS_DAO_CLASS="Mock",
+                               RESTCLIENTS_HRPWS_LOG_DATA_LIMIT=0):
+            with self.assertLogs("uw_hrp", level="DEBUG") as cm:
+                hrp.get_resource(url)
+        self.assertEqual(
+            cm.output[1],
+            "DEBUG:uw_hrp:{0} ==data==> ({1} chars)".format(url, len(data)))
+
     def test_get_person_by_netid(self):
         hrp = HRP()
         self.assertRaises(DataFailureException,
@@ -119,8 +151,198 @@ class HrpTest(TestCase):
         self.assertRaises(InvalidRegID,
                           hrp.get_person_by_regid, "000")
 
+    def test_get_persons(self):
+        hrp = HRP()
+        persons = hrp.get_persons(
+            ["faculty", "", "faculty", "None"], max_workers=2)
+        self.assertEqual(list(persons.keys()), ["faculty", "", "None"])
+        self.assertEqual(persons["faculty"].employee_id, "000000005")
+        self.assertIsInstance(persons[""], InvalidNetID)
+        self.assertIsInstance(persons["None"], DataFailureException)
+        self.assertEqual(persons["None"].status, 404)
+
+        persons = hrp.get_persons(
+            ["000000005", "000"], id_type="employee_id")
+        self.assertEqual(persons["000000005"].netid, "bill")
+        self.assertIsInstance(persons["000"], InvalidEmployeeID)
+
+        persons = hrp.get_persons(
+            ["9136CCB8F66711D5BE060004AC494FFE", "000"], id_type="regid")
+        self.assertEqual(persons["9136CCB8F66711D5BE060004AC494FFE"].netid,
+                         "javerage")
+        self.assertIsInstance(persons["000"], InvalidRegID)
+
+        self.assertEqual(hrp.get_persons([]), {})
+        self.assertRaises(ValueError, hrp.get_persons, ["bill"],
+                          id_type="student_id")
+
+    def test_lazy_person(self):
+        hrp = HRP(lazy=True)
+        person = hrp.get_person_by_netid("faculty")
+        self.assertNotIn("worker_details", person.__dict__)
+        self.assertEqual(person.to_json(),
+                         HRP().get_person_by_netid("faculty").to_json())
+
+        persons = list(hrp.iter_person_search(
+            current_faculty="true", page_size=1))
+        self.assertEqual([p.is_active for p in persons], [True, True, False])
+        self.assertNotIn("worker_details", persons[0].__dict__)
+
+    def test_fields(self):
+        hrp = HRP()
+        self.assertRaises(ValueError, hrp.get_person_by_netid, "faculty",
+                          fields=["name"])
+
+        person = hrp.get_person_by_netid("faculty", fields=[])
+        self.assertEqual(person.employee_id, "000000005")
+        self.assertTrue(person.is_active)
+        self.assertEqual(person.primary_manager_id, "845007271")
+        self.assertEqual(person.worker_details, [])
+
+        person = hrp.get_person_by_regid(
+            "9136CCB8F66711D5BE060004AC494FFE", fields=["primary_position"])
+        self.assertEqual(person.primary_manager_id, "100000001")
+        worker = person.worker_details[0]
+        self.assertIsNone(worker.employee_status)
+        self.assertEqual(worker.primary_position.org_code, "CAS")
+        self.assertEqual(worker.other_active_positions, [])
+
+        person = hrp.get_person_by_regid(
+            "9136CCB8F66711D5BE060004AC494FFE",
+            fields=["employment_status", "other_positions"])
+        worker = person.worker_details[0]
+        self.assertTrue(worker.employee_status.is_active)
+        self.assertIsNone(worker.primary_position)
+        self.assertEqual(worker.primary_manager_id, "100000001")
+        self.assertEqual(len(worker.other_active_positions), 1)
+
+        full = hrp.get_person_by_regid("9136CCB8F66711D5BE060004AC494FFE")
+        person = hrp.get_person_by_regid(
+            "9136CCB8F66711D5BE060004AC494FFE", fields=WORKER_FIELDS)
+        self.assertEqual(person.to_json(), full.to_json())
+
+        persons = list(hrp.iter_person_search(
+            current_faculty="true", page_size=1, fields=["primary_position"]))
+        self.assertEqual([p.worker_details[0].primary_position.org_code
+                          for p in persons[:2]], ["SOM", "CAS"])
+        persons = hrp.iter_person_search_concurrent(
+            current_faculty="true", page_size=1, fields=[])
+        self.assertEqual([len(p.worker_details) for p in persons], [0, 0, 0])
+
+    def test_fields_cache(self):
+        hrp = HRP(cache=LRUCache())
+        person = hrp.get_person_by_netid("faculty", fields=[])
+        self.assertEqual(len(hrp.cache), 0)
+        person = hrp.get_person_by_netid("faculty")
+        self.assertIs(hrp.get_person_by_netid("faculty", fields=[]), person)
+
     def test_person_search(self):
         hrp = HRP()
         persons = hrp.person_search(changed_since_date="2022-12-12")
         self.assertEqual(len(persons), 1)
         self.assertFalse(persons[0].is_active)
+
+    def test_person_search_pages(self):
+        hrp = HRP()
+        persons = hrp.person_search(current_faculty="true", page_size=1)
+        self.assertEqual(len(persons), 3)
+        self.assertEqual(persons[0].employee_id, "000000005")
+        self.assertEqual(persons[1].employee_id, "123456789")
+        self.assertEqual(persons[2].employee_id, "100000001")
+
+    def test_iter_person_search(self):
+        hrp = HRP()
+        persons = hrp.iter_person_search(current_faculty="true", page_size=1)
+        self.assertIsInstance(persons, GeneratorType)
+        self.assertIsNone(hrp.req_url)
+        person = next(persons)
+        self.assertEqual(person.employee_id, "000000005")
+        self.assertEqual(
+            hrp.req_url,
+            "/hrp/v3/person.json?current_faculty=true&page_size=1")
+        person = next(persons)
+        self.assertEqual(person.employee_id, "123456789")
+        self.assertTrue(hrp.req_url.endswith("&page_start=2"))
+        self.assertEqual(len(list(persons)), 1)
+
+        persons = hrp.iter_person_search(changed_since_date="2022-12-12")
+        self.assertEqual(len(list(persons)), 1)
+
+    def test_get_next_href(self):
+        self.assertIsNone(get_next_href({}))
+        self.assertIsNone(get_next_href({"Next": None}))
+        self.assertIsNone(get_next_href({"Next": {"Href": None}}))
+        self.assertIsNone(get_next_href({"Next": {"Href": ""}}))
+        self.assertEqual(get_next_href({"Next": {"Href": "/next"}}), "/next")
+
+    def test_iter_person_search_concurrent(self):
+        hrp = HRP()
+        for max_workers in [1, 2, 4]:
+            persons = list(hrp.iter_person_search_concurrent(
+                max_workers=max_workers, current_faculty="true",
+                page_size=1))
+            self.assertEqual(
+                [p.employee_id for p in persons],
+                ["000000005", "123456789", "100000001"])
+
+        # no Next.Href, TotalCount is not used
+        persons = list(hrp.iter_person_search_concurrent(
+            changed_since_date="2022-12-12"))
+        self.assertEqual(len(persons), 1)
+
+        persons = hrp.iter_person_search_concurrent(
+            current_faculty="false", page_size=1)
+        self.assertRaises(DataFailureException, next, persons)
+
+    def test_iter_person_search_concurrent_total_count(self):
+        hrp = HRP()
+        get_search_page = hrp._get_search_page
+        employee_ids = ["000000005", "123456789", "100000001"]
+
+        for total_count in [None, 0, 1, 2, 5]:
+            def get_page(url, build=False, fields=None):
+                data, persons = get_search_page(url, build, fields)
+                if total_count is None:
+                    del data["TotalCount"]
+                else:
+                    data["TotalCount"] = total_count
+                return data, persons
+
+            with patch.object(hrp, "_get_search_page", side_effect=get_page):
+                persons = list(hrp.iter_person_search_concurrent(
+                    max_workers=2, current_faculty="true", page_size=1))
+            self.assertEqual([p.employee_id for p in persons],
+                             employee_ids)
+
+    def test_iter_person_search_concurrent_page_size(self):
+        hrp = HRP()
+        get_search_page = hrp._get_search_page
+
+        # the pages are counted by the page size returned
+        for current in [{"PageSize": "1"}, None]:
+            def get_page(url, build=False, fields=None):
+                data, persons = get_search_page(url, build, fields)
+                data["Current"] = current
+                return data, persons
+
+            with patch.object(hrp, "_get_search_page",
+                              side_effect=get_page) as mock:
+                persons = list(hrp.iter_person_search_concurrent(
+                    max_workers=2, current_faculty="true", page_size=1))
+            self.assertEqual(len(persons), 3)
+            self.assertEqual(mock.call_count, 3)
+
+        self.assertEqual(get_page_size(
+            {"Current": {"PageSize": "200"}, "Persons": [{}]}), 200)
+        self.assertEqual(get_page_size({"Current": None, "Persons": [{}]}), 1)
+        self.assertEqual(get_page_size({}), 0)
+
+    def test_get_page_href(self):
+        url = "/hrp/v3/person.json?current_faculty=true&page_size=1"
+        self.assertEqual(get_page_start(url), 1)
+        self.assertEqual(get_page_href(url, 2), url + "&page_start=2")
+        url = "/hrp/v3/person.json?name=&page_start=2&page_size=1"
+        self.assertEqual(get_page_start(url), 2)
+        self.assertEqual(
+            get_page_href(url, 5),
+            "/hrp/v3/person.json?name=&page_start=5&page_size=1")
@@ -0,0 +1,69 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_hrp import HRP
+from uw_hrp.instrument import NULL_CALL, STAGES, Call, StageStats
+from uw_hrp.util import fdao_hrp_override
+
+
+@fdao_hrp_override
+class InstrumentTest(TestCase):
+
+    def test_disabled(self):
+        hrp = HRP()
+        self.assertIs(hrp._start_call("/url"), NULL_CALL)
+        with NULL_CALL.stage("fetch"):
+            NULL_CALL.set_records(1)
+        NULL_CALL.finish()
+
+    def test_person(self):
+        calls = []
+        hrp = HRP(instrument=calls.append)
+        person = hrp.get_person_by_netid("faculty")
+        self.assertEqual(person.employee_id, "000000005")
+        self.assertEqual(len(calls), 1)
+        call = calls[0]
+        self.assertIsInstance(call, Call)
+        self.assertEqual(call.url, "/hrp/v3/person/faculty.json")
+        self.assertEqual(call.status, 200)
+        self.assertEqual(call.records, 1)
+        self.assertTrue(call.bytes > 0)
+        self.assertEqual(sorted(call.timings), sorted(STAGES))
+        for seconds in call.timings.values():
+            self.assertTrue(seconds >= 0)
+
+        self.assertRaises(DataFailureException,
+                          hrp.get_person_by_netid, "none")
+        self.assertEqual(calls[1].status, 404)
+        self.assertEqual(list(calls[1].timings), ["fetch"])
+
+    def test_stage_stats(self):
+        stats = StageStats()
+        hrp = HRP(instrument=stats)
+        persons = hrp.person_search(current_faculty="true", page_size=1)
+        self.assertEqual(len(persons), 3)
+        hrp.get_resource("/hrp/v3/person/faculty.json")
+        self.assertRaises(DataFailureException,
+                          hrp.get_resource, "/hrp/v3/person/none.json")
+
+        result = stats.stats()
+        self.assertEqual(result["calls"], 5)
+        self.assertEqual(result["records"], 3)
+        self.assertEqual(result["errors"], {404: 1})
+        self.assertTrue(result["bytes"] > 0)
+        self.assertEqual(sorted(result["timings"]), sorted(STAGES))
+        self.assertTrue(result["timings"]["build"] > 0)
+        self.assertTrue(result["timings"]["parse"] > 0)
+
+    def test_search_concurrent(self):
+        calls = []
+        hrp = HRP(instrument=calls.append)
+        persons = list(hrp.iter_person_search_concurrent(
+            current_faculty="true", page_size=1))
+        self.assertEqual(len(persons), 3)
+        self.assertEqual([call.records for call in calls], [1, 1, 1])
+        for call in calls:
+            self.assertEqual(sorted(call.timings), sorted(STAGES))
@@ -0,0 +1,101 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_hrp import HRP
+from uw_hrp.mmap_snapshot import MmapSnapshot, write_mmap_snapshot
+from uw_hrp.snapshot import SnapshotHRP
+from uw_hrp.util import fdao_hrp_override
+
+
+@fdao_hrp_override
+class MmapSnapshotTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "persons.snapshot")
+        self.snapshot = MmapSnapshot.build(
+            self.path, current_faculty="true", page_size=1)
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.tmpdir.cleanup()
+
+    def test_get_record(self):
+        self.assertEqual(len(self.snapshot), 3)
+        self.assertEqual(self.snapshot.watermark,
+                         "2022-11-29T10:59:11.706-08:00")
+        for id in ["bill", "BILL", "000000005",
+                   "10000000000000000000000000000005",
+                   "10000000000000000000000000000003"]:
+            self.assertEqual(
+                self.snapshot.get_record(id)["EmployeeID"], "000000005")
+        self.assertEqual(self.snapshot.get_record(
+            "9136CCB8F66711D5BE060004AC494FFE")["EmployeeID"], "123456789")
+        self.assertIsNone(self.snapshot.get_record("none"))
+        self.assertIsNone(self.snapshot.get_record("a"))
+        self.assertIsNone(self.snapshot.get_record("zzz"))
+        self.assertIsNone(self.snapshot.get_record(
+            "bill", key_types=["regid"]))
+
+    def test_find_records(self):
+        records = self.snapshot.find_records("supervisor_eid", "845007271")
+        self.assertEqual([r["EmployeeID"] for r in records], ["000000005"])
+        self.assertEqual(self.snapshot.find_records("org_code", "none"), [])
+        self.assertRaises(ValueError, self.snapshot.find_records,
+                          "name", "bill")
+
+    def test_duplicate_keys(self):
+        records = list(HRP().iter_person_records(
+            current_faculty="true", page_size=1))
+        path = os.path.join(self.tmpdir.name, "dup.snapshot")
+        changed = dict(records[0],
+                       RepositoryTimeStamp="2023-01-01T00:00:00.000-08:00")
+        self.assertEqual(
+            write_mmap_snapshot(path, records + records[1:] + [changed]), 3)
+        with MmapSnapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(
+                len(snapshot.find_records("org_code", "cas")), 1)
+            self.assertEqual(
+                snapshot.find_records("employee_id", "000000005"), [changed])
+            self.assertEqual(snapshot.get_record("bill"), changed)
+
+        write_mmap_snapshot(path, [])
+        with MmapSnapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertIsNone(snapshot.watermark)
+            self.assertIsNone(snapshot.get_record("bill"))
+
+    def test_changed_since(self):
+        # the sync fixture has employee 000000005 on pages 1 and 3
+        path = os.path.join(self.tmpdir.name, "changed.snapshot")
+        with MmapSnapshot.build(path, changed_since_date="2022-11-29",
+                                page_size=1) as snapshot:
+            self.assertEqual(len(snapshot), 2)
+            records = snapshot.find_records("employee_id", "000000005")
+            self.assertEqual(len(records), 1)
+            self.assertEqual(snapshot.get_record("bill"), records[0])
+
+    def test_invalid_file(self):
+        path = os.path.join(self.tmpdir.name, "invalid")
+        with open(path, "wb") as f:
+            f.write(b"0" * 64)
+        self.assertRaises(ValueError, MmapSnapshot, path)
+
+    def test_snapshot_hrp(self):
+        hrp = SnapshotHRP(self.snapshot, lazy=True)
+        person = hrp.get_person_by_netid("bill")
+        self.assertEqual(person.to_json(),
+                         HRP().get_person_by_netid("faculty").to_json())
+        self.assertEqual(hrp.get_person_by_regid(
+            "9136CCB8F66711D5BE060004AC494FFE").netid, "javerage")
+        self.assertRaises(DataFailureException,
+                          hrp.get_person_by_employee_id, "000000001")
+        self.assertEqual(
+            [p.netid for p in hrp.get_persons_by_org_code("CAS")],
+            ["javerage"])
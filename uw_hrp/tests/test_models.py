@@ -2,11 +2,19 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+from concurrent.futures import ThreadPoolExecutor
+from dateutil.parser import parse
+from os.path import dirname
 from unittest import TestCase
+import json
+import os
+import pickle
 from uw_hrp.models import (
     EmploymentStatus, JobProfile,
     EmploymentDetails, WorkerDetails, Person, parse_date,
-    get_emp_program_job_class, get_org_code_name)
+    get_emp_program_job_class, get_org_code_name, get_supervisor_eid,
+    get_supervisory_org, get_netid, is_active_worker,
+    get_primary_manager_id)
 from uw_hrp.util import fdao_hrp_override
 
 
@@ -15,6 +23,17 @@ class ModelsTest(TestCase):
 
     def test_parse_date(self):
         self.assertIsNotNone(parse_date("2017-09-16T07:00:00.000Z"))
+        self.assertIsNone(parse_date(None))
+        for date_str in ["2006-05-16T00:00:00-07:00",
+                         "2022-11-29T10:56:28.477-08:00",
+                         "2017-09-16T07:00:00.000Z",
+                         "2022-12-12",
+                         "May 16, 2006 12:00 AM"]:
+            self.assertEqual(parse_date(date_str), parse(date_str))
+            self.assertEqual(str(parse_date(date_str)),
+                             str(parse(date_str)))
+        self.assertIs(parse_date("2006-05-16T00:00:00-07:00"),
+                      parse_date("2006-05-16T00:00:00-07:00"))
 
     def test_get_emp_program_job_class(self):
         data = [
@@ -50,6 +69,103 @@ class ModelsTest(TestCase):
         self.assertEqual(code, "")
         self.assertEqual(name, "School of Law")
 
+    def test_get_supervisory_org(self):
+        self.assertEqual(get_supervisory_org({}), ("", ""))
+        self.assertEqual(get_supervisory_org(
+            {"SupervisoryOrganization": {"Name": None}}), ("", ""))
+        self.assertEqual(get_supervisory_org({"SupervisoryOrganization": {
+            "Name": "CAS: Chemistry: Theberge JM Student (...())"}}),
+            ("CAS", "Chemistry: Theberge JM Student"))
+
+    def test_get_netid(self):
+        self.assertEqual(get_netid(None), "")
+        self.assertEqual(get_netid([{"Type": "StudentID", "Value": "1"}]), "")
+        self.assertEqual(get_netid([{"Type": "StudentID", "Value": "1"},
+                                    {"Type": "NetID", "Value": "bill"}]),
+                         "bill")
+
+    def test_get_supervisor_eid(self):
+        self.assertIsNone(get_supervisor_eid(None))
+        self.assertIsNone(get_supervisor_eid([]))
+        self.assertEqual(get_supervisor_eid([
+            {"IDs": [{"Type": "WID", "Value": "abc"},
+                     {"Type": "Employee_ID", "Value": "845007271"}]},
+            {"IDs": [{"Type": "Employee_ID", "Value": "100000001"}]}
+        ]), "845007271")
+
+    def test_get_primary_manager_id(self):
+        data = {
+            "EmploymentStatus": {"Active": True},
+            "EmploymentDetails": [
+                {"PrimaryPosition": False, "Managers": [
+                    {"IDs": [{"Type": "Employee_ID", "Value": "1"}]}]},
+                {"PrimaryPosition": True, "Managers": [
+                    {"IDs": [{"Type": "Employee_ID", "Value": "2"}]}]},
+            ]
+        }
+        self.assertTrue(is_active_worker(data))
+        self.assertEqual(get_primary_manager_id(data), "2")
+        data["EmploymentStatus"]["Active"] = False
+        self.assertFalse(is_active_worker(data))
+        self.assertIsNone(get_primary_manager_id(data))
+        self.assertFalse(is_active_worker({"EmploymentStatus": None}))
+
+    def test_lazy_person(self):
+        path = os.path.join(dirname(__file__), "..", "resources", "hrpws",
+                            "file", "hrp", "v3")
+        files = [os.path.join(path, "person", name) for name in [
+            "faculty.json", "9136CCB8F66711D5BE060004AC494FFE.json"]]
+        records = []
+        for name in files:
+            with open(name) as f:
+                records.append(json.load(f))
+        with open(os.path.join(
+                path, "person.json_changed_since_date_2022-12-12_"
+                "page_size_200")) as f:
+            records.extend(json.load(f)["Persons"])
+
+        for data in records:
+            person = Person(data=data)
+            lazy_person = Person(data=data, lazy=True)
+            self.assertIn("_worker_details_data", lazy_person.__dict__)
+            for attr in ["netid", "regid", "employee_id", "student_id",
+                         "is_active", "primary_manager_id", "prior_regids"]:
+                self.assertEqual(getattr(lazy_person, attr),
+                                 getattr(person, attr))
+            self.assertNotIn("worker_details", lazy_person.__dict__)
+
+            self.assertEqual(lazy_person.to_json(), person.to_json())
+            self.assertNotIn("_worker_details_data", lazy_person.__dict__)
+            self.assertIs(lazy_person.worker_details,
+                          lazy_person.worker_details)
+            self.assertRaises(AttributeError, getattr, lazy_person, "none")
+
+    def test_pickle_person(self):
+        path = os.path.join(dirname(__file__), "..", "resources", "hrpws",
+                            "file", "hrp", "v3", "person", "faculty.json")
+        with open(path) as f:
+            data = json.load(f)
+        for lazy in [False, True]:
+            person = Person(data=data, lazy=lazy)
+            copy = pickle.loads(pickle.dumps(person))
+            self.assertEqual(copy.netid, "bill")
+            self.assertEqual(copy.to_json(), person.to_json())
+            copy.netid = "faculty"
+            self.assertEqual(person.netid, "bill")
+
+    def test_lazy_person_threads(self):
+        path = os.path.join(dirname(__file__), "..", "resources", "hrpws",
+                            "file", "hrp", "v3", "person", "faculty.json")
+        with open(path) as f:
+            data = json.load(f)
+        for i in range(20):
+            person = Person(data=data, lazy=True)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(
+                    lambda i: person.worker_details, range(8)))
+            for worker_details in results:
+                self.assertIs(worker_details, person.worker_details)
+
     def test_employment_status(self):
         emp_status0 = EmploymentStatus(status="Active", is_active=True)
         self.assertIsNotNone(emp_status0)
@@ -273,6 +389,8 @@ class ModelsTest(TestCase):
                         regid="10000000",
                         employee_id="100000115")
         self.assertIsNotNone(worker)
+        self.assertEqual(worker.identifiers(),
+                         ["none", "10000000", "100000115"])
 
         data = {
             "Name": "Bill Faculty",
@@ -331,6 +449,11 @@ class ModelsTest(TestCase):
             ]
         }
         worker = Person(data=data)
+        self.assertEqual(worker.prior_regids,
+                         ["10000000000000000000000000000001"])
+        self.assertEqual(worker.identifiers(), [
+            "bill", "10000000000000000000000000000005", "000000005",
+            "10000000000000000000000000000001"])
         self.maxDiff = None
         self.assertEqual(
             worker.to_json(),
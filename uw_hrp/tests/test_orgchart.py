@@ -0,0 +1,143 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+from unittest import TestCase
+from uw_hrp.orgchart import OrgIndex, ReportingIndex, ReportingCycleError
+from uw_hrp.util import fdao_hrp_override
+
+
+def person_record(employee_id, *positions):
+    # positions are (supervisor_eid, org_code, is_primary)
+    return {
+        "EmployeeID": employee_id,
+        "IDs": [],
+        "WorkerDetails": [{
+            "EmploymentStatus": {"Active": True},
+            "EmploymentDetails": [{
+                "PrimaryPosition": is_primary,
+                "Managers": [{"IDs": [
+                    {"Type": "Employee_ID", "Value": supervisor_eid}]}],
+                "SupervisoryOrganization": {
+                    "Name": "{0}: Org".format(org_code)},
+            } for supervisor_eid, org_code, is_primary in positions]
+        }]
+    }
+
+
+@fdao_hrp_override
+class ReportingIndexTest(TestCase):
+
+    def setUp(self):
+        self.index = ReportingIndex()
+        self.index.add_records([
+            person_record("1", (None, "UW", True)),
+            person_record("2", ("1", "UW", True)),
+            person_record("3", ("2", "CSE", True), ("1", "UW", False)),
+            person_record("4", ("2", "CSE", True)),
+        ])
+
+    def test_direct_reports(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.direct_reports("1"), set(["2", "3"]))
+        self.assertEqual(self.index.direct_reports("2"), set(["3", "4"]))
+        self.assertEqual(self.index.direct_reports("4"), set())
+        self.assertEqual(self.index.primary_manager("3"), "2")
+        self.assertIsNone(self.index.primary_manager("1"))
+
+    def test_management_chain(self):
+        self.assertEqual(self.index.management_chain("4"), ["2", "1"])
+        self.assertEqual(self.index.management_chain("1"), [])
+        self.assertEqual(self.index.management_chain("9"), [])
+        self.assertEqual(self.index.find_cycles(), [])
+
+    def test_cycles(self):
+        self.index.add_record(person_record("1", ("4", "UW", True)))
+        self.assertEqual(self.index.direct_reports("1"), set(["2", "3"]))
+        self.assertEqual(self.index.direct_reports("4"), set(["1"]))
+        with self.assertRaises(ReportingCycleError) as cm:
+            self.index.management_chain("3")
+        self.assertEqual(cm.exception.cycle, ["2", "1", "4", "2"])
+        with self.assertRaises(ReportingCycleError) as cm:
+            self.index.management_chain("1")
+        self.assertEqual(cm.exception.cycle, ["1", "4", "2", "1"])
+        self.assertEqual(len(self.index.find_cycles()), 1)
+        self.assertEqual(sorted(self.index.find_cycles()[0]),
+                         ["1", "2", "4"])
+
+        self.index.add_record(person_record("5", ("5", "UW", True)))
+        self.assertEqual(len(self.index.find_cycles()), 2)
+
+    def test_orgs(self):
+        self.assertEqual(self.index.org_members("UW"), set(["1", "2", "3"]))
+        self.assertEqual(self.index.org_members("CSE"), set(["3", "4"]))
+        self.assertEqual(self.index.orgs("3"), set(["UW", "CSE"]))
+
+        # the frozensets returned are stored, untouched by later changes
+        reports = self.index.direct_reports("2")
+        members = self.index.org_members("CSE")
+        for ids in [reports, members, self.index.orgs("3")]:
+            self.assertIsInstance(ids, frozenset)
+        self.assertIs(self.index.direct_reports("2"), reports)
+        self.assertIs(self.index.org_members("CSE"), members)
+
+        # replacing a record moves its reporting lines and orgs
+        self.index.add_record(person_record("4", ("1", "UW", True)))
+        self.assertEqual(reports, set(["3", "4"]))
+        self.assertEqual(members, set(["3", "4"]))
+        self.assertEqual(self.index.direct_reports("2"), set(["3"]))
+        self.assertEqual(self.index.org_members("CSE"), set(["3"]))
+        self.index.remove("3")
+        self.assertEqual(self.index.org_members("CSE"), set())
+        self.assertEqual(self.index.direct_reports("2"), set())
+        self.assertEqual(len(self.index), 3)
+
+    def test_build(self):
+        index = ReportingIndex.build(current_faculty="true", page_size=1)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.direct_reports("845007271"),
+                         set(["000000005"]))
+        self.assertEqual(index.management_chain("000000005"),
+                         ["845007271"])
+        self.assertEqual(index.org_members("SOM"), set(["000000005"]))
+
+
+@fdao_hrp_override
+class OrgIndexTest(TestCase):
+
+    def test_build(self):
+        index = OrgIndex.build(current_faculty="true", page_size=1)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.orgs(), ["CAS", "LIB", "SOM", "UAA"])
+        self.assertEqual(index.orgs("hr_org"), ["Family Medicine"])
+        self.assertEqual(index.members("SOM"), set(["000000005"]))
+        self.assertEqual(index.members("Family Medicine", "hr_org"),
+                         set(["000000005"]))
+        self.assertEqual(index.counts("SOM"), {"Unpaid Academic": 1})
+        self.assertEqual(index.counts("CAS", by="job_class"),
+                         {"Undergraduate Student": 1})
+        self.assertEqual(index.counts("UAA", by="active"), {False: 1})
+        self.assertEqual(index.counts("LIB", by="active"), {True: 1})
+        self.assertEqual(index.counts("NONE"), {})
+        self.assertEqual(index.members("NONE"), set())
+        self.assertRaises(ValueError, index.counts, "SOM", by="netid")
+        self.assertRaises(ValueError, index.members, "SOM", "org_name")
+
+    def test_replace(self):
+        index = OrgIndex()
+        index.add_record(person_record(
+            "1", (None, "UW", True), (None, "UW", False)))
+        index.add_record(person_record("2", ("1", "UW", True)))
+        self.assertEqual(index.counts("UW", by="active"), {True: 3})
+        members = index.members("UW")
+        self.assertEqual(members, set(["1", "2"]))
+        self.assertIs(index.members("UW"), members)
+
+        index.add_record(person_record("1", (None, "CSE", True)))
+        self.assertEqual(index.counts("UW", by="active"), {True: 1})
+        self.assertEqual(index.members("UW"), set(["2"]))
+        self.assertEqual(members, set(["1", "2"]))
+        self.assertEqual(index.members("CSE"), set(["1"]))
+        index.remove("2")
+        self.assertEqual(index.orgs(), ["CSE"])
+        self.assertEqual(len(index), 1)
@@ -0,0 +1,317 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+from unittest import TestCase
+from unittest.mock import patch
+from commonconf import override_settings
+from restclients_core.dao import MockDAO
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from uw_hrp import HRP
+from uw_hrp.cache import LRUCache
+from uw_hrp.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy)
+
+flaky_dao_override = override_settings(
+    RESTCLIENTS_HRPWS_DAO_CLASS="uw_hrp.tests.test_resilience.FlakyDAO")
+
+
+class FlakyDAO(MockDAO):
+    """
+    Serves the mock resources after failing with each of the queued
+    statuses, status 0 raising a connection error as the live DAO does
+    """
+    failures = []
+    requests = 0
+
+    def load(self, method, url, headers, body):
+        FlakyDAO.requests += 1
+        if FlakyDAO.failures:
+            status = FlakyDAO.failures.pop(0)
+            if status == 0:
+                raise DataFailureException(url, 0, "Read timed out")
+            response = MockHTTP()
+            response.status = status
+            response.data = "Unavailable"
+            return response
+        return super(FlakyDAO, self).load(method, url, headers, body)
+
+
+def retry_policy(**kwargs):
+    policy = RetryPolicy(**kwargs)
+    policy.sleeps = []
+    policy.sleep = policy.sleeps.append
+    return policy
+
+
+class RetryPolicyTest(TestCase):
+
+    def test_get_delay(self):
+        policy = RetryPolicy(backoff=0.5, max_backoff=3, jitter=False)
+        self.assertEqual([policy.get_delay(i) for i in range(5)],
+                         [0.5, 1.0, 2.0, 3.0, 3.0])
+        policy.jitter = True
+        for i in range(20):
+            self.assertTrue(0 <= policy.get_delay(3) <= 3.0)
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        for i in range(10):
+            budget.deposit()
+        self.assertEqual(budget.tokens, 2)
+
+    def test_from_dao(self):
+        hrp = HRP()
+        self.assertIsNone(hrp.retry)
+        with override_settings(RESTCLIENTS_HRPWS_RETRIES=2,
+                               RESTCLIENTS_HRPWS_RETRY_BACKOFF=0.1):
+            hrp = HRP()
+        self.assertEqual(hrp.retry.retries, 2)
+        self.assertEqual(hrp.retry.backoff, 0.1)
+        self.assertEqual(hrp.retry.budget.ratio, 0.1)
+        RetryPolicy.budgets.clear()
+
+    def test_shared_budget(self):
+        FlakyDAO.failures = [503] * 100
+        FlakyDAO.requests = 0
+        with override_settings(
+                RESTCLIENTS_HRPWS_DAO_CLASS=(
+                    "uw_hrp.tests.test_resilience.FlakyDAO"),
+                RESTCLIENTS_HRPWS_RETRIES=3,
+                RESTCLIENTS_HRPWS_RETRY_BACKOFF=0):
+            self.assertIs(HRP().retry.budget, HRP().retry.budget)
+            for i in range(6):
+                # a new client per lookup draws on the same budget
+                self.assertRaises(DataFailureException,
+                                  HRP().get_person_by_netid, "faculty")
+        # 10 tokens, plus 0.1 per request, allow 10 retries
+        self.assertEqual(FlakyDAO.requests, 6 + 10)
+        RetryPolicy.budgets.clear()
+        FlakyDAO.failures = []
+
+
+class CircuitBreakerTest(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.breaker = CircuitBreaker(
+            failure_threshold=2, latency_threshold=1, reset_timeout=10)
+        self.breaker.clock = lambda: self.now
+
+    def fail(self, status=503):
+        raise DataFailureException("/url", status, "")
+
+    def slow(self):
+        self.now += 2
+        return "slow"
+
+    def test_open(self):
+        breaker = self.breaker
+        self.assertEqual(breaker.call("/url", lambda: "ok"), "ok")
+        self.assertRaises(DataFailureException, breaker.call, "/url",
+                          self.fail)
+        # a 404 is not a failure of the service
+        self.assertRaises(DataFailureException, breaker.call, "/url",
+                          self.fail, 404)
+        self.assertEqual(breaker.stats()["failures"], 0)
+        self.assertRaises(DataFailureException, breaker.call, "/url",
+                          self.fail)
+        with self.assertLogs("uw_hrp", level="WARNING"):
+            self.assertEqual(breaker.call("/url", self.slow), "slow")
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError) as cm:
+            breaker.call("/url", lambda: "ok")
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(breaker.stats(), {
+            "state": "open", "failures": 2, "opened": 1, "rejected": 1})
+
+    def test_half_open(self):
+        breaker = self.breaker
+        with self.assertLogs("uw_hrp", level="WARNING"):
+            for i in range(2):
+                self.assertRaises(DataFailureException, breaker.call,
+                                  "/url", self.fail, 0)
+        self.now += 9
+        self.assertRaises(CircuitOpenError, breaker.call, "/url", self.fail)
+
+        # one trial call after reset_timeout, and its failure reopens
+        self.now += 1
+        with self.assertLogs("uw_hrp", level="WARNING"):
+            self.assertRaises(DataFailureException, breaker.call, "/url",
+                              self.fail)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenError, breaker.call, "/url", self.fail)
+
+        self.now += 10
+        self.assertEqual(breaker.call("/url", lambda: "ok"), "ok")
+        self.assertEqual(breaker.stats(), {
+            "state": "closed", "failures": 0, "opened": 2, "rejected": 2})
+
+    def test_success_while_open(self):
+        breaker = self.breaker
+
+        def in_flight():
+            # the breaker opens while this call is in flight
+            with self.assertLogs("uw_hrp", level="WARNING"):
+                for i in range(2):
+                    self.assertRaises(DataFailureException, breaker.call,
+                                      "/url", self.fail)
+            return "ok"
+
+        self.assertEqual(breaker.call("/url", in_flight), "ok")
+        self.assertEqual(breaker.stats(), {
+            "state": "open", "failures": 2, "opened": 1, "rejected": 0})
+        self.assertRaises(CircuitOpenError, breaker.call, "/url", self.fail)
+
+    def test_from_dao(self):
+        self.assertIsNone(HRP().breaker)
+        with override_settings(RESTCLIENTS_HRPWS_BREAKER_FAILURES=3,
+                               RESTCLIENTS_HRPWS_BREAKER_LATENCY=2.5):
+            hrp = HRP()
+            self.assertIs(HRP().breaker, hrp.breaker)
+        self.assertEqual(hrp.breaker.failure_threshold, 3)
+        self.assertEqual(hrp.breaker.latency_threshold, 2.5)
+        self.assertEqual(hrp.breaker.reset_timeout, 30)
+        CircuitBreaker.breakers.clear()
+
+
+@flaky_dao_override
+class HRPRetryTest(TestCase):
+
+    def setUp(self):
+        FlakyDAO.failures = []
+        FlakyDAO.requests = 0
+
+    def test_retry(self):
+        hrp = HRP(retry=retry_policy(jitter=False))
+        FlakyDAO.failures = [503, 0, 502]
+        person = hrp.get_person_by_netid("faculty")
+        self.assertEqual(person.employee_id, "000000005")
+        self.assertEqual(FlakyDAO.requests, 4)
+        self.assertEqual(hrp.retry.sleeps, [0.5, 1.0, 2.0])
+        self.assertEqual(hrp.retry.stats(), {
+            "requests": 1, "retries": 3, "failures": 0,
+            "budget_exhausted": 0, "retry_delay": 3.5,
+            "budget_tokens": 7.0})
+
+    def test_no_retry(self):
+        hrp = HRP(retry=retry_policy(retries=1))
+        FlakyDAO.failures = [503, 503]
+        with self.assertRaises(DataFailureException) as cm:
+            hrp.get_person_by_netid("faculty")
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(FlakyDAO.requests, 2)
+
+        # a 404 is not transient
+        with self.assertRaises(DataFailureException) as cm:
+            hrp.get_person_by_netid("none")
+        self.assertEqual(cm.exception.status, 404)
+        self.assertEqual(FlakyDAO.requests, 3)
+        self.assertEqual(hrp.retry.stats()["failures"], 2)
+
+        hrp = HRP()
+        FlakyDAO.failures = [503]
+        self.assertRaises(DataFailureException,
+                          hrp.get_person_by_netid, "faculty")
+
+    def test_budget_exhausted(self):
+        hrp = HRP(retry=retry_policy(
+            retries=3, budget=RetryBudget(ratio=0.1, max_tokens=2)))
+        FlakyDAO.failures = [503] * 4
+        with self.assertRaises(DataFailureException):
+            hrp.get_person_by_netid("faculty")
+        self.assertEqual(FlakyDAO.requests, 3)
+        stats = hrp.retry.stats()
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["budget_exhausted"], 1)
+
+    def test_person_search(self):
+        hrp = HRP(retry=retry_policy())
+        FlakyDAO.failures = [502]
+        persons = hrp.person_search(current_faculty="true", page_size=1)
+        self.assertEqual(len(persons), 3)
+        FlakyDAO.failures = [0]
+        self.assertEqual(len(list(hrp.iter_person_search(
+            current_faculty="true", page_size=1))), 3)
+        self.assertEqual(hrp.retry.stats()["retries"], 2)
+
+
+@flaky_dao_override
+class HRPStaleTest(TestCase):
+
+    def setUp(self):
+        FlakyDAO.failures = []
+        FlakyDAO.requests = 0
+        self.hrp = HRP(cache=LRUCache(ttl=10, stale_ttl=60),
+                       breaker=CircuitBreaker(failure_threshold=1))
+        self.refreshes = []
+        refresh_person = self.hrp._refresh_person
+        self.hrp._refresh_person = lambda *args: self.refreshes.append(
+            refresh_person(*args))
+
+    def get_person(self, now):
+        with patch("uw_hrp.cache.time.monotonic", return_value=now):
+            person = self.hrp.get_person_by_netid("faculty")
+            for future in self.refreshes:
+                if future is not None:
+                    future.result()
+        return person
+
+    def test_stale_while_revalidate(self):
+        person = self.get_person(100)
+        self.assertIs(self.get_person(105), person)
+        self.assertEqual(FlakyDAO.requests, 1)
+
+        # expired: the stale person is returned and refreshed
+        self.assertIs(self.get_person(115), person)
+        self.assertEqual(len(self.refreshes), 1)
+        self.assertEqual(FlakyDAO.requests, 2)
+        refreshed = self.get_person(120)
+        self.assertIsNot(refreshed, person)
+        self.assertEqual(refreshed.employee_id, "000000005")
+        self.assertEqual(FlakyDAO.requests, 2)
+
+    def test_refresh_per_cache(self):
+        other = HRP(cache=LRUCache(ttl=10, stale_ttl=60))
+        other.get_person_by_netid("faculty")
+        url = "/hrp/v3/person/faculty.json"
+        # a refresh into this cache doesn't hold back one into another
+        with HRP._refresh_lock:
+            HRP._refreshing.add((id(self.hrp.cache), url))
+        try:
+            self.assertIsNone(HRP._refresh_person(self.hrp, url, False))
+            future = other._refresh_person(url, False)
+            self.assertEqual(future.result().employee_id, "000000005")
+        finally:
+            with HRP._refresh_lock:
+                HRP._refreshing.discard((id(self.hrp.cache), url))
+
+    def test_stale_circuit_open(self):
+        person = self.get_person(100)
+        FlakyDAO.failures = [503]
+        with self.assertLogs("uw_hrp", level="WARNING"):
+            self.assertIs(self.get_person(115), person)
+        self.assertEqual(self.hrp.breaker.state, CircuitBreaker.OPEN)
+
+        # fails fast with no upstream request while open
+        with self.assertLogs("uw_hrp", level="WARNING") as cm:
+            self.assertIs(self.get_person(116), person)
+        self.assertIn("Circuit breaker open", cm.output[0])
+        self.assertEqual(FlakyDAO.requests, 2)
+        with patch("uw_hrp.cache.time.monotonic", return_value=116):
+            self.assertRaises(CircuitOpenError,
+                              self.hrp.get_person_by_netid, "javerage")
+
+        # beyond stale_ttl the failure is raised
+        with patch("uw_hrp.cache.time.monotonic", return_value=200):
+            self.assertRaises(CircuitOpenError, self.hrp.get_person_by_netid,
+                              "faculty")
@@ -0,0 +1,96 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException, InvalidNetID
+from uw_hrp import HRP
+from uw_hrp.snapshot import PersonSnapshot, SnapshotHRP, get_index_keys
+from uw_hrp.util import fdao_hrp_override
+
+
+@fdao_hrp_override
+class SnapshotTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "persons.sqlite3")
+        self.snapshot = PersonSnapshot.build(
+            self.path, current_faculty="true", page_size=1)
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.tmpdir.cleanup()
+
+    def test_get_index_keys(self):
+        data = next(HRP().iter_person_records(
+            current_faculty="true", page_size=1))
+        self.assertEqual(get_index_keys(data), set([
+            ("regid", "10000000000000000000000000000005"),
+            ("prior_regid", "10000000000000000000000000000001"),
+            ("prior_regid", "10000000000000000000000000000002"),
+            ("prior_regid", "10000000000000000000000000000003"),
+            ("employee_id", "000000005"),
+            ("netid", "bill"),
+            ("supervisor_eid", "845007271"),
+            ("org_code", "som")]))
+
+    def test_build(self):
+        self.assertEqual(len(self.snapshot), 3)
+        self.assertEqual(self.snapshot.watermark,
+                         "2022-11-29T10:59:11.706-08:00")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(
+            self.snapshot.get_record("bill")["EmployeeID"], "000000005")
+        self.assertEqual(self.snapshot.get_record(
+            "9136ccb8f66711d5be060004ac494ffe")["EmployeeID"], "123456789")
+        self.assertIsNone(self.snapshot.get_record("none"))
+        self.assertIsNone(self.snapshot.get_record(
+            "bill", key_types=["employee_id"]))
+        self.assertEqual(
+            len(self.snapshot.find_records("org_code", "CAS")), 1)
+        self.assertRaises(ValueError, self.snapshot.find_records,
+                          "name", "bill")
+
+        # rebuilding replaces the snapshot
+        snapshot = PersonSnapshot.build(
+            self.path, changed_since_date="2022-12-12")
+        self.assertEqual(len(snapshot), 1)
+        snapshot.close()
+
+    def test_update(self):
+        count = self.snapshot.update(page_size=1)
+        self.assertEqual(count, 3)
+        self.assertEqual(len(self.snapshot), 3)
+        self.assertEqual(
+            len(self.snapshot.find_records("netid", "bill")), 1)
+        self.assertRaises(ValueError,
+                          PersonSnapshot(self.path + "2").update)
+
+    def test_snapshot_hrp(self):
+        hrp = SnapshotHRP(self.snapshot)
+        person = hrp.get_person_by_netid("bill")
+        self.assertEqual(person.to_json(),
+                         HRP().get_person_by_netid("faculty").to_json())
+        self.assertEqual(hrp.get_person_by_employee_id("000000005").netid,
+                         "bill")
+        self.assertEqual(hrp.get_person_by_regid(
+            "10000000000000000000000000000002").netid, "bill")
+        self.assertEqual(hrp.get_person_by_regid(
+            "9136CCB8F66711D5BE060004AC494FFE").netid, "javerage")
+        self.assertRaises(InvalidNetID, hrp.get_person_by_netid, "")
+        self.assertRaises(DataFailureException, hrp.get_person_by_netid,
+                          "faculty")
+
+        persons = hrp.get_persons(["bill", "abcde", "none"])
+        self.assertFalse(persons["abcde"].is_active)
+        self.assertIsInstance(persons["none"], DataFailureException)
+
+        self.assertEqual(
+            [p.netid for p in hrp.get_persons_by_supervisor("845007271")],
+            ["bill"])
+        self.assertEqual(
+            [p.netid for p in hrp.get_persons_by_org_code(
+                "som", fields=[])], ["bill"])
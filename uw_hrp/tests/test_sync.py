@@ -0,0 +1,87 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from uw_hrp.sync import PersonSync, SyncState, latest_timestamp
+from uw_hrp.util import fdao_hrp_override
+
+
+@fdao_hrp_override
+class SyncTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "sync.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_latest_timestamp(self):
+        self.assertIsNone(latest_timestamp(None, ""))
+        self.assertEqual(latest_timestamp(None, "2022-11-29T10:56:28-08:00"),
+                         "2022-11-29T10:56:28-08:00")
+        self.assertEqual(latest_timestamp("2022-11-29T10:56:28-08:00", ""),
+                         "2022-11-29T10:56:28-08:00")
+        self.assertEqual(latest_timestamp("2022-11-29T10:56:28-08:00",
+                                          "2022-11-29T18:00:00Z"),
+                         "2022-11-29T10:56:28-08:00")
+        self.assertEqual(latest_timestamp("2022-11-29T10:56:28-08:00",
+                                          "2022-11-29T19:00:00Z"),
+                         "2022-11-29T19:00:00Z")
+
+    def test_sync_state(self):
+        state = SyncState(self.path)
+        self.assertEqual(state.load(), {})
+        state.save({"watermark": "2022-11-29"})
+        self.assertEqual(state.load(), {"watermark": "2022-11-29"})
+        self.assertEqual(state.load_seen(), {})
+        state.add_seen({"a": "t1"})
+        state.add_seen({"b": "t2"})
+        self.assertEqual(state.load_seen(), {"a": "t1", "b": "t2"})
+        state.clear_seen()
+        state.clear_seen()
+        self.assertEqual(state.load_seen(), {})
+
+    def test_changes(self):
+        sync = PersonSync(self.path, page_size=1)
+        self.assertIsNone(sync.watermark)
+        self.assertRaises(ValueError, list, sync.changes())
+
+        sync = PersonSync(self.path, since="2022-11-29", page_size=1)
+        persons = list(sync.changes())
+        # the faculty record on page 3 is a duplicate of page 1
+        self.assertEqual([p.employee_id for p in persons],
+                         ["000000005", "123456789"])
+        self.assertEqual(sync.watermark, "2022-11-29T10:59:11.706-08:00")
+        self.assertEqual(sync.state.load(),
+                         {"watermark": "2022-11-29T10:59:11.706-08:00"})
+        self.assertFalse(os.path.exists(self.path + ".seen"))
+
+        # the next sync starts from the watermark's date, skipping the
+        # records not changed since the watermark
+        self.assertEqual(list(sync.changes()), [])
+        self.assertEqual(sync.watermark, "2022-11-29T10:59:11.706-08:00")
+
+        sync.state.save({"watermark": "2022-11-29T10:56:28.477-08:00"})
+        persons = list(sync.changes())
+        self.assertEqual([p.employee_id for p in persons], ["123456789"])
+        self.assertEqual(sync.watermark, "2022-11-29T10:59:11.706-08:00")
+
+    def test_resume(self):
+        sync = PersonSync(self.path, since="2022-11-29", page_size=1)
+        changes = sync.changes()
+        self.assertEqual(next(changes).employee_id, "000000005")
+        self.assertEqual(next(changes).employee_id, "123456789")
+        changes.close()  # interrupted before page 2 is completed
+
+        state = sync.state.load()
+        self.assertTrue(state["next_url"].endswith("&page_start=2"))
+        self.assertIsNone(sync.watermark)
+
+        sync = PersonSync(self.path, since="2022-11-29", page_size=1)
+        persons = list(sync.changes())
+        self.assertEqual([p.employee_id for p in persons], ["123456789"])
+        self.assertEqual(sync.watermark, "2022-11-29T10:59:11.706-08:00")